@@ -18,8 +18,12 @@
 import json
 import rados
 import os, os.path
+import re
+import struct
 import subprocess
 import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 class RadosCMD(rados.Rados):
     def command_mon(self, cmd, params=None):
@@ -34,8 +38,89 @@ class RadosCMD(rados.Rados):
     def command_pg(self, pgid, cmd):
         return self.pg_command(pgid, json.dumps({'prefix': cmd, 'format': 'json'}), b'', timeout=5)
 
+bluefs_re = re.compile(rb'"bluefs"\s*:\s*')
+
+def recv_exact(sock, length):
+    buf = bytearray(length)
+    view = memoryview(buf)
+    pos = 0
+    while pos < length:
+        n = sock.recv_into(view[pos:])
+        if n == 0:
+            raise EOFError('admin socket closed after %d of %d bytes' % (pos, length))
+        pos += n
+    return bytes(buf)
+
+def get_bluefs(adminsocket):
+    """returns the bluefs counters from the perf dump of an OSD admin socket
+
+    The answer is prefixed with its length. Only the bluefs object is
+    decoded instead of the whole perf dump."""
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(5)
+            sock.connect(adminsocket)
+            sock.sendall(b'{"prefix": "perf dump"}\n')
+            length = struct.unpack('>I', recv_exact(sock, 4))[0]
+            data = recv_exact(sock, length)
+        finally:
+            sock.close()
+        match = bluefs_re.search(data)
+        if match:
+            return json.JSONDecoder().raw_decode(data[match.end():].decode('utf-8'))[0]
+    except Exception:
+        pass
+    return {}
+
+def command_mon_cached(cmd):
+    """runs a cluster wide mon command or reads its result from the shared cache
+
+    The node that finds the cached result older than cache_ttl creates a
+    lock file and refreshes it, the other nodes keep using the old result
+    meanwhile. A lock older than cache_ttl is taken over."""
+    if not cache_dir:
+        return cluster.command_mon(cmd)
+    path = os.path.join(cache_dir, '%s.%s.json' % (fsid, cmd.replace(' ', '_')))
+    lock = path + '.lock'
+    try:
+        age = time.time() - os.stat(path).st_mtime
+    except OSError:
+        age = None
+    if age is None or age >= cache_ttl:
+        try:
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                if time.time() - os.stat(lock).st_mtime < cache_ttl and age is not None:
+                    raise
+                os.utime(lock)
+        except OSError:
+            pass
+        else:
+            try:
+                res = cluster.command_mon(cmd)
+                if res[0] == 0:
+                    tmp = '%s.%s.%d' % (path, hostname, os.getpid())
+                    with open(tmp, 'wb') as f:
+                        f.write(res[1])
+                    os.replace(tmp, path)
+                return res
+            finally:
+                try:
+                    os.unlink(lock)
+                except OSError:
+                    pass
+    try:
+        with open(path, 'rb') as f:
+            return 0, f.read(), ''
+    except OSError:
+        return cluster.command_mon(cmd)
+
 ceph_config='/etc/ceph/ceph.conf'
 ceph_client='client.admin'
+cache_dir=None
+cache_ttl=60
 try:
     with open(os.path.join(os.environ['MK_CONFDIR'], 'ceph.cfg'), 'r') as config:
         for line in config.readlines():
@@ -45,6 +130,10 @@ try:
                     ceph_config = value
                 if key == 'CLIENT':
                     ceph_client = value
+                if key == 'CACHE_DIR':
+                    cache_dir = value
+                if key == 'CACHE_TTL':
+                    cache_ttl = int(value)
 except FileNotFoundError:
     pass
 
@@ -54,6 +143,7 @@ cluster.connect()
 hostname = socket.gethostname().split('.', 1)[0]
 fqdn = socket.getfqdn()
 
+fsid = ""
 res = cluster.command_mon("status")
 if res[0] == 0:
     status = json.loads(res[1])
@@ -72,10 +162,9 @@ if res[0] == 0:
             print(json.dumps(json.loads(res[1])))
 
 localosds = []
-res = cluster.command_mon("osd metadata")
+adminsockets = {}
+res = command_mon_cached("osd metadata")
 if res[0] == 0:
-    print("<<<cephosdbluefs:sep(0)>>>")
-    out = {'end': {}}
     for osd in json.loads(res[1]):
         if osd.get('hostname') in [hostname, fqdn]:
             localosds.append(osd['id'])
@@ -84,23 +173,23 @@ if res[0] == 0:
             else:
                 adminsocket = "/run/ceph/ceph-osd.%d.asok" % osd['id']
             if os.path.exists(adminsocket):
-                chunks = []
-                try:
-                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-                    sock.connect(adminsocket)
-                    sock.sendall(b'{"prefix": "perf dump"}\n')
-                    sock.shutdown(socket.SHUT_WR)
-                    while len(chunks) == 0 or chunks[-1] != b'':
-                        chunks.append(sock.recv(4096))
-                    sock.close()
-                    chunks[0] = chunks[0][4:]
-                except:
-                    chunks = [b'{"bluefs": {}}']
-                out[osd['id']] = {'bluefs': json.loads(b"".join(chunks))['bluefs']}
+                adminsockets[osd['id']] = adminsocket
+
+# the admin sockets are read in parallel while osd df and osd perf are queried
+with ThreadPoolExecutor(max_workers=8) as executor:
+    futures = {osdid: executor.submit(get_bluefs, adminsocket) for osdid, adminsocket in adminsockets.items()}
+    osddf_raw = command_mon_cached("osd df")
+    osdperf_raw = command_mon_cached("osd perf")
+    bluefs = {osdid: future.result() for osdid, future in futures.items()}
+
+if res[0] == 0:
+    print("<<<cephosdbluefs:sep(0)>>>")
+    out = {'end': {}}
+    for osdid in localosds:
+        if osdid in bluefs:
+            out[osdid] = {'bluefs': bluefs[osdid]}
     print(json.dumps(out))
 
-osddf_raw = cluster.command_mon("osd df")
-osdperf_raw = cluster.command_mon("osd perf")
 if osddf_raw[0] == 0 and osdperf_raw[0] == 0:
     osddf = json.loads(osddf_raw[1])
     osdperf = json.loads(osdperf_raw[1])
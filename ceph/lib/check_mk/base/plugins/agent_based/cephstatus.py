@@ -34,6 +34,7 @@ from .agent_based_api.v1 import (
 
 from .utils import df
 
+from functools import lru_cache
 import json
 import time
 import re
@@ -61,74 +62,85 @@ def discovery_cephstatus(section) -> DiscoveryResult:
     if 'health' in section:
         yield Service(item='Status')
 
+# known PG states in the order they are reported
+_pgstates_list = [
+    'activating+undersized',
+    'activating+undersized+degraded',
+    'active+clean',
+    'active+clean+inconsistent',
+    'active+clean+remapped',
+    'active+clean+scrubbing',
+    'active+clean+scrubbing+deep',
+    'active+clean+scrubbing+deep+repair',
+    'active+clean+scrubbing+deep+snaptrim_wait',
+    'active+clean+snaptrim',
+    'active+clean+snaptrim_wait',
+    'active+clean+wait',
+    'active+degraded',
+    'active+recovering',
+    'active+recovering+degraded',
+    'active+recovering+degraded+inconsistent',
+    'active+recovering+degraded+remapped',
+    'active+recovering+remapped',
+    'active+recovering+undersized',
+    'active+recovering+undersized+degraded+remapped',
+    'active+recovering+undersized+remapped',
+    'active+recovery_wait',
+    'active+recovery_wait+degraded',
+    'active+recovery_wait+degraded+inconsistent',
+    'active+recovery_wait+degraded+remapped',
+    'active+recovery_wait+remapped',
+    'active+recovery_wait+undersized+degraded',
+    'active+recovery_wait+undersized+degraded+remapped',
+    'active+recovery_wait+undersized+remapped',
+    'active+remapped',
+    'active+remapped+backfilling',
+    'active+remapped+backfill_toofull',
+    'active+remapped+backfill_wait',
+    'active+remapped+backfill_wait+backfill_toofull',
+    'active+remapped+inconsistent+backfilling',
+    'active+remapped+inconsistent+backfill_toofull',
+    'active+remapped+inconsistent+backfill_wait',
+    'active+undersized',
+    'active+undersized+degraded',
+    'active+undersized+degraded+inconsistent',
+    'active+undersized+degraded+remapped+backfilling',
+    'active+undersized+degraded+remapped+backfill_toofull',
+    'active+undersized+degraded+remapped+backfill_wait',
+    'active+undersized+degraded+remapped+inconsistent+backfilling',
+    'active+undersized+degraded+remapped+inconsistent+backfill_toofull',
+    'active+undersized+degraded+remapped+inconsistent+backfill_wait',
+    'active+undersized+remapped',
+    'active+undersized+remapped+backfilling',
+    'active+undersized+remapped+backfill_toofull',
+    'active+undersized+remapped+backfill_wait',
+    'down',
+    'incomplete',
+    'peering',
+    'remapped+peering',
+    'stale+active+clean',
+    'stale+active+undersized',
+    'stale+active+undersized+degraded',
+    'stale+undersized+degraded+peered',
+    'stale+undersized+peered',
+    'undersized+degraded+peered',
+    'undersized+peered',
+    'unknown',
+]
+_pgstates_order = { state: i for i, state in enumerate(_pgstates_list) }
+
+@lru_cache(maxsize=None)
+def _classify_pgstate(state_name):
+    """returns the monitoring state for a PG state, also for states not in _pgstates_list"""
+    if 'stale' in state_name:
+        return State.UNKNOWN
+    if 'inconsistent' in state_name or 'incomplete' in state_name or 'active' not in state_name:
+        return State.CRIT
+    if 'active+clean' not in state_name:
+        return State.WARN
+    return State.OK
+
 def check_cephstatus(item, params, section) -> CheckResult:
-    _single_state = { 'state': State.OK, 'count': 0 }
-    _pgstates_list = ['activating+undersized',
-                      'activating+undersized+degraded',
-                      'active+clean',
-                      'active+clean+inconsistent',
-                      'active+clean+remapped',
-                      'active+clean+scrubbing',
-                      'active+clean+scrubbing+deep',
-                      'active+clean+scrubbing+deep+repair',
-                      'active+clean+scrubbing+deep+snaptrim_wait',
-                      'active+clean+snaptrim',
-                      'active+clean+snaptrim_wait',
-                      'active+clean+wait',
-                      'active+degraded',
-                      'active+recovering',
-                      'active+recovering+degraded',
-                      'active+recovering+degraded+inconsistent',
-                      'active+recovering+degraded+remapped',
-                      'active+recovering+remapped',
-                      'active+recovering+undersized',
-                      'active+recovering+undersized+degraded+remapped',
-                      'active+recovering+undersized+remapped',
-                      'active+recovery_wait',
-                      'active+recovery_wait+degraded',
-                      'active+recovery_wait+degraded+inconsistent',
-                      'active+recovery_wait+degraded+remapped',
-                      'active+recovery_wait+remapped',
-                      'active+recovery_wait+undersized+degraded',
-                      'active+recovery_wait+undersized+degraded+remapped',
-                      'active+recovery_wait+undersized+remapped',
-                      'active+remapped',
-                      'active+remapped+backfilling',
-                      'active+remapped+backfill_toofull',
-                      'active+remapped+backfill_wait',
-                      'active+remapped+backfill_wait+backfill_toofull',
-                      'active+remapped+inconsistent+backfilling',
-                      'active+remapped+inconsistent+backfill_toofull',
-                      'active+remapped+inconsistent+backfill_wait',
-                      'active+undersized',
-                      'active+undersized+degraded',
-                      'active+undersized+degraded+inconsistent',
-                      'active+undersized+degraded+remapped+backfilling',
-                      'active+undersized+degraded+remapped+backfill_toofull',
-                      'active+undersized+degraded+remapped+backfill_wait',
-                      'active+undersized+degraded+remapped+inconsistent+backfilling',
-                      'active+undersized+degraded+remapped+inconsistent+backfill_toofull',
-                      'active+undersized+degraded+remapped+inconsistent+backfill_wait',
-                      'active+undersized+remapped',
-                      'active+undersized+remapped+backfilling',
-                      'active+undersized+remapped+backfill_toofull',
-                      'active+undersized+remapped+backfill_wait',
-                      'down',
-                      'incomplete',
-                      'peering',
-                      'remapped+peering',
-                      'stale+active+clean',
-                      'stale+active+undersized',
-                      'stale+active+undersized+degraded',
-                      'stale+undersized+degraded+peered',
-                      'stale+undersized+peered',
-                      'undersized+degraded+peered',
-                      'undersized+peered',
-                      'unknown',
-                     ]
-    _ceph_pgstates = {}
-    for state in _pgstates_list:
-        _ceph_pgstates[state] = _single_state.copy()
     value_store = get_value_store()
 
     if 'health' in section:
@@ -209,24 +221,15 @@ def check_cephstatus(item, params, section) -> CheckResult:
                          summary='%s/s recovering' % render.bytes(pgmap['recovering_bytes_per_sec']))
             yield Metric('recovering', pgmap['recovering_bytes_per_sec'])
         if 'pgs_by_state' in pgmap:
+            counts = {}
             for pgstate in pgmap['pgs_by_state']:
-                if pgstate['state_name'] in _ceph_pgstates:
-                    _ceph_pgstates[pgstate['state_name']]['count'] = pgstate['count']
-                else:
-                    yield Result(state=State.UNKNOWN,
-                                 summary='new PG state: ' + pgstate['state_name'])
-                    continue
-                if 'inconsistent' in pgstate['state_name'] or 'incomplete' in pgstate['state_name'] or 'active' not in pgstate['state_name']:
-                    _ceph_pgstates[pgstate['state_name']]['state'] = State.CRIT
-                elif 'active+clean' not in pgstate['state_name']:
-                    _ceph_pgstates[pgstate['state_name']]['state'] = State.WARN
-                if 'stale' in pgstate['state_name']:
-                    _ceph_pgstates[pgstate['state_name']]['state'] = State.UNKNOWN
-            for pgstate, info in _ceph_pgstates.items():
-                if info['count'] > 0:
-                    yield Result(state=info['state'],
-                                 summary='%d PGs in %s' % (info['count'], pgstate))
-                    yield Metric('pgstate_%s' % pgstate.replace('+', '_'), info['count'])
+                counts[pgstate['state_name']] = pgstate['count']
+            # known states in their fixed order, new ones after them
+            for pgstate in sorted(counts, key=lambda state: (_pgstates_order.get(state, len(_pgstates_order)), state)):
+                if counts[pgstate] > 0:
+                    yield Result(state=_classify_pgstate(pgstate),
+                                 summary='%d PGs in %s' % (counts[pgstate], pgstate))
+                    yield Metric('pgstate_%s' % pgstate.replace('+', '_'), counts[pgstate])
     if 'mgrmap' in section:
         if 'services' in section['mgrmap']:
             if 'dashboard' in section['mgrmap']['services']:
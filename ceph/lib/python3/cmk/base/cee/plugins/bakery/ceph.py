@@ -29,6 +29,9 @@ def get_ceph_files(conf: Dict[str, Any]) -> FileGenerator:
         config_lines.append('CONFIG=%s' % conf['config'])
     if 'client' in conf:
         config_lines.append('CLIENT=%s' % conf['client'])
+    if 'cache' in conf:
+        config_lines.append('CACHE_DIR=%s' % conf['cache']['dir'])
+        config_lines.append('CACHE_TTL=%d' % conf['cache']['ttl'])
     if config_lines:
         yield PluginConfig(base_os=OS.LINUX,
                            lines=config_lines,
@@ -23,9 +23,11 @@ try:
     )
     from cmk.gui.cee.plugins.wato.agent_bakery.rulespecs.utils import RulespecGroupMonitoringAgentsAgentPlugins
     from cmk.gui.valuespec import (
+        Age,
         Alternative,
         Dictionary,
         Filename,
+        FixedValue,
         TextInput,
         Transform,
     )
@@ -63,8 +65,28 @@ try:
                                   title = _("Client name"),
                                   default_value = "client.admin",
                                   )),
+                            ( "cache",
+                              Dictionary(
+                                  title = _("Shared cache for cluster wide commands"),
+                                  help = _("The results of <tt>osd metadata</tt>, <tt>osd df</tt> and <tt>osd perf</tt> "
+                                           "are stored in a directory shared by all Ceph nodes, e.g. on CephFS. "
+                                           "Only one node queries the monitors per interval, the others read the files."),
+                                  elements = [
+                                      ( "dir",
+                                        Filename(
+                                            title = _("Cache directory"),
+                                            default_value = "/mnt/cephfs/check_mk",
+                                            )),
+                                      ( "ttl",
+                                        Age(
+                                            title = _("Maximum age of the cached results"),
+                                            default_value = 60,
+                                            )),
+                                  ],
+                                  optional_keys = [],
+                                  )),
                         ],
-                        optional_keys = ['config', 'client'],
+                        optional_keys = ['config', 'client', 'cache'],
                     ),
                     FixedValue( None, title = _("Do not deploy plugin for Ceph"), totext = _('(disabled)') ),
                 ],
@@ -13,9 +13,14 @@
 import requests
 import warnings # type: ignore
 import os
+import io
+import csv
 import json
 import time # type: ignore
 import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from ast import literal_eval # type: ignore
 
 def _check_mk_url(url):
@@ -51,13 +56,14 @@ def _site_creds(username=None):
     return username, password
 
 class CMKRESTAPI():
-    def __init__(self, site_url=None, api_user=None, api_secret=None):
+    def __init__(self, site_url=None, api_user=None, api_secret=None, max_workers=8):
         """Initialize a REST-API instance. URL, User and Secret can be automatically taken from local site if running as site user.
 
         Args:
             site_url: the site URL
             api_user: username of automation user account
             api_secret: automation secret
+            max_workers: maximum number of requests in flight when using parallel()
 
         Returns:
             instance of CMKRESTAPI
@@ -67,9 +73,22 @@ class CMKRESTAPI():
         if not api_secret:
             api_user, api_secret = _site_creds(api_user)
         self._api_url = '%sapi/1.0' % _check_mk_url(site_url)
-        self._session = requests.session()
-        self._session.headers['Authorization'] = f"Bearer {api_user} {api_secret}"
-        self._session.headers['Accept'] = 'application/json'
+        self._headers = {
+            'Authorization': f"Bearer {api_user} {api_secret}",
+            'Accept': 'application/json',
+        }
+        self._local = threading.local()
+        self.max_workers = max_workers
+
+    @property
+    def _session(self):
+        # requests sessions are not thread safe, every thread gets its own
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.session()
+            session.headers.update(self._headers)
+            self._local.session = session
+        return session
 
     def _check_response(self, resp):
         if resp.content:
@@ -152,6 +171,50 @@ class CMKRESTAPI():
             return data, etag
         resp.raise_for_status()        
 
+    def parallel(self, method, arguments, max_workers=None):
+        """Calls an API method concurrently for a list of arguments.
+
+        Every worker thread uses its own session, all of them are closed
+        when the calls are done. ETags are handled per call as usual, e.g.
+        edit_host() without etag looks up the host first in the same worker.
+
+        Args:
+            method: a method of this instance, e.g. api.get_host
+            arguments: list of positional argument tuples or keyword argument dicts, a single non-tuple value is passed as the only argument
+            max_workers: maximum number of requests in flight, defaults to the instance setting
+
+        Returns:
+            list of results in the order of arguments, a failed call has the raised exception as its result
+        """
+        sessions = set()
+        lock = threading.Lock()
+
+        def _call(args):
+            try:
+                if isinstance(args, dict):
+                    return method(**args)
+                if not isinstance(args, tuple):
+                    args = (args,)
+                return method(*args)
+            finally:
+                session = getattr(self._local, 'session', None)
+                if session is not None:
+                    with lock:
+                        sessions.add(session)
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            futures = [ executor.submit(_call, args) for args in arguments ]
+        # the worker threads are gone, release their connection pools
+        for session in sessions:
+            session.close()
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
 #   .--Folder--------------------------------------------------------------.
 #   |                     _____     _     _                                |
 #   |                    |  ___|__ | | __| | ___ _ __                      |
@@ -366,15 +429,36 @@ class CMKRESTAPI():
             data={"effective_attributes": "true" if effective_attr else "false"}
         )
 
-    def get_all_hosts(self, effective_attr=False, attributes=True):
+    def get_hosts(self, hostnames, effective_attr=False, max_workers=None):
+        """Gets the configuration of several hosts concurrently.
+
+        Args:
+            hostnames: list of hostnames
+            effective_attr: Show all effective attributes, see get_host()
+            max_workers: maximum number of requests in flight, defaults to the instance setting
+
+        Returns:
+            Dictionary of hostname -> (data, etag) or the raised exception if the host could not be fetched
+        """
+        hostnames = list(hostnames)
+        results = self.parallel(
+            self.get_host,
+            [ (hostname, effective_attr) for hostname in hostnames ],
+            max_workers=max_workers,
+        )
+        return dict(zip(hostnames, results))
+
+    def get_all_hosts(self, effective_attr=False, attributes=True, bulk=False):
         """Gets all hosts from the CheckMK configuration.
 
         Args:
             effective_attr: Show all effective attributes, which affect this host, not just the attributes which were set on this host specifically. This includes all attributes of all of this host's parent folders.
             attributes: If False do not fetch hosts' data
+            bulk: If True take the hosts' data from the collection response instead of fetching every host on its own. The collection does not carry per host ETags, so every etag is returned as None and edit_host() looks the host up again before editing it.
 
         Returns:
             hosts: Dictionary of host data or dict of hostname -> URL depending on aatributes parameter
+            etags: Dictionary of hostname -> etag
         """
         data, etag = self._request(
             self._get_url,
@@ -397,7 +481,10 @@ class CMKRESTAPI():
                 else:
                     hosts[hinfo['title']] = hinfo['href']
             elif hinfo.get('domainType') == 'host_config':
-                if attributes:
+                if attributes and bulk:
+                    hosts[hinfo['id']] = hinfo['extensions']
+                    etags[hinfo['id']] = None
+                elif attributes:
                     self_urls = [
                         link['href'] 
                         for link in hinfo.get("links", [])
@@ -468,6 +555,107 @@ class CMKRESTAPI():
             )
         return None, None
 
+    def _bulk_hosts(self, method, uri, entries, chunk_size, ok_code=200, etag=None):
+        if isinstance(ok_code, int):
+            ok_code=[ok_code]
+        succeeded = []
+        failed = {}
+        for start in range(0, len(entries), chunk_size):
+            chunk = entries[start:start + chunk_size]
+            names = [ entry['host_name'] if isinstance(entry, dict) else entry for entry in chunk ]
+            data, _etag, resp = method(uri, etag, {"entries": chunk})
+            if resp.status_code in ok_code:
+                if isinstance(data, dict) and 'value' in data:
+                    succeeded.extend(data['value'])
+                else:
+                    succeeded.extend(names)
+                continue
+            if resp.status_code not in [400, 404, 409, 412, 422]:
+                resp.raise_for_status()
+            ext = data.get('ext', {}) if isinstance(data, dict) else {}
+            if ext.get('failed_hosts'):
+                failed.update(ext['failed_hosts'])
+                succeeded.extend(ext.get('succeeded_hosts', {}).get('value', []))
+            else:
+                msg = data.get('detail', data.get('title', resp.reason)) if isinstance(data, dict) else resp.reason
+                for name in names:
+                    failed[name] = msg
+        return succeeded, failed
+
+    def bulk_add_hosts(self, entries={}, chunk_size=100):
+        """Bulk adds hosts to the CheckMK configuration.
+
+        Args:
+            entries: Mapping of hostname to a dict with 'folder' and optional 'attributes'
+            chunk_size: number of hosts sent per request
+
+        Returns:
+            (succeeded, failed)
+            succeeded: list of created hosts' data
+            failed: Dictionary of hostname -> error message
+        """
+        list_of_hosts = []
+        for hostname, host in entries.items():
+            list_of_hosts.append({
+                'host_name': hostname,
+                'folder': host.get('folder', '/'),
+                'attributes': host.get('attributes', {}),
+            })
+        return self._bulk_hosts(
+            self._post_url,
+            "domain-types/host_config/actions/bulk-create/invoke",
+            list_of_hosts,
+            chunk_size,
+        )
+
+    def bulk_edit_hosts(self, entries={}, chunk_size=100):
+        """Bulk edits hosts in the CheckMK configuration.
+
+        Args:
+            entries: Mapping of hostname to a dict with one of 'set_attr', 'update_attr' or 'unset_attr' (see edit_host())
+            chunk_size: number of hosts sent per request
+
+        Returns:
+            (succeeded, failed)
+            succeeded: list of edited hosts' data
+            failed: Dictionary of hostname -> error message
+        """
+        list_of_hosts = []
+        for hostname, changes in entries.items():
+            if changes.get('set_attr'):
+                list_of_hosts.append({'host_name': hostname, 'attributes': changes['set_attr']})
+            elif changes.get('update_attr'):
+                list_of_hosts.append({'host_name': hostname, 'update_attributes': changes['update_attr']})
+            elif changes.get('unset_attr'):
+                list_of_hosts.append({'host_name': hostname, 'remove_attributes': changes['unset_attr']})
+        return self._bulk_hosts(
+            self._put_url,
+            "domain-types/host_config/actions/bulk-update/invoke",
+            list_of_hosts,
+            chunk_size,
+            etag='*',
+        )
+
+    def bulk_delete_hosts(self, entries=[], chunk_size=100):
+        """Bulk deletes hosts from the CheckMK configuration.
+
+        Args:
+            entries: list of hostnames
+            chunk_size: number of hosts sent per request
+
+        Returns:
+            (succeeded, failed)
+            succeeded: list of deleted hostnames
+            failed: Dictionary of hostname -> error message
+        """
+        return self._bulk_hosts(
+            self._post_url,
+            "domain-types/host_config/actions/bulk-delete/invoke",
+            list(entries),
+            chunk_size,
+            ok_code=204,
+        )
+
     def disc_host(self, hostname, mode="new"):
         """Discovers services on a host.
 
@@ -1734,6 +1922,58 @@ class MultisiteAPI():
             else:
                 resp.raise_for_status()
 
+    def _api_stream(self, api_url, params):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            params.update(self._api_creds)
+            params.update({
+                'output_format': 'csv',
+                'csv_separator': ';',
+            })
+            with requests.get(
+                self._site_url + api_url,
+                verify=False,
+                params=params,
+                allow_redirects=False,
+                stream=True,
+            ) as resp:
+                if resp.status_code != 200:
+                    resp.raise_for_status()
+                resp.raw.decode_content = True
+                reader = csv.reader(
+                    io.TextIOWrapper(resp.raw, encoding=resp.encoding or 'utf-8', newline=''),
+                    delimiter=';',
+                )
+                for row in reader:
+                    if row and row[0].startswith('MESSAGE: '):
+                        continue
+                    if row and row[0].startswith('ERROR: '):
+                        raise ValueError(';'.join(row)[7:])
+                    yield row
+
+    def view_stream(self, view_name, **kwargs):
+        """Fetches data from a Multisite view row by row
+
+        The view is requested as CSV and parsed while it is downloaded,
+        so memory usage does not depend on the size of the view.
+        All values are returned as strings.
+
+        Args:
+            view_name: name of the view to query
+            kwargs: more arguments for the view
+
+        Returns:
+            Generator of Dictionaries, every item is a Dict(TableHeader -> Value) for the row
+        """
+        request = {'view_name': view_name}
+        request.update(kwargs)
+        rows = self._api_stream('view.py', request)
+        header = next(rows, None)
+        if header is None:
+            return
+        for data in rows:
+            yield dict(zip(header, data))
+
     def view(self, view_name, **kwargs):
         """Fetches data from a Multisite view
 
@@ -1756,3 +1996,46 @@ class MultisiteAPI():
             result.append(item)
         return result
 
+class PatternMatcher():
+    """Matches values against all regular expressions of one attribute at once
+
+    All patterns are combined into one regular expression with an optional
+    lookahead per pattern, so a single regex match reports every pattern
+    that would have matched with re.search(). Results are memoized per
+    distinct value as the same values repeat in most views.
+    """
+    _backref = re.compile(r'\\[1-9]')
+
+    def __init__(self, patterns):
+        self.results = list(patterns.values())
+        self._patterns = [ re.compile(pattern, re.IGNORECASE) for pattern in patterns ]
+        self._cache = {}
+        try:
+            if any(self._backref.search(pattern) for pattern in patterns):
+                # numbered backreferences would point to the wrong groups
+                raise re.error('backreference')
+            # the skip prefix crosses newlines like re.search() does,
+            # the patterns themselves keep their own meaning of "."
+            self._combined = re.compile(
+                ''.join(r'(?:(?=[\s\S]*?(?P<_p%d>%s)))?' % (i, pattern) for i, pattern in enumerate(patterns)),
+                re.IGNORECASE)
+            self._groups = [ self._combined.groupindex['_p%d' % i] for i in range(len(self._patterns)) ]
+        except re.error:
+            self._combined = None
+
+    def _search(self, value):
+        if value not in self._cache:
+            if self._combined:
+                match = self._combined.match(value)
+                self._cache[value] = tuple(i for i, group in enumerate(self._groups) if match.group(group) is not None)
+            else:
+                self._cache[value] = tuple(i for i, pattern in enumerate(self._patterns) if pattern.search(value))
+        return self._cache[value]
+
+    def matches(self, values):
+        """Returns the results of all patterns matching any of the values in pattern order"""
+        found = set()
+        for value in values:
+            if value:
+                found.update(self._search(value))
+        return [ self.results[i] for i in sorted(found) ]
@@ -9,12 +9,11 @@
 import argparse # type: ignore
 import checkmkapi
 import re # type: ignore
+import requests
 from ast import literal_eval # type: ignore
 from pprint import pprint # type: ignore
 
-def get_host_labels(hostname):
-    host, etag = wato.get_host(hostname)
-
+def get_host_labels(host):
     orig_labels = host['extensions']['attributes'].get('labels', {})
     host_labels = {}
 
@@ -24,7 +23,13 @@ def get_host_labels(hostname):
             if not label.startswith(conf['label_prefix'][attr]):
                 host_labels[label] = value
 
-    return host_labels, orig_labels, etag
+    return host_labels, orig_labels
+
+def handle_error(hostname, er):
+    if isinstance(er, requests.exceptions.HTTPError) and er.response.status_code == 404:
+        print("%s not found." % hostname)
+    else:
+        raise(er)
 
 parser = argparse.ArgumentParser()
 parser.add_argument('-s', '--url', help='URL to Check_MK site')
@@ -37,27 +42,24 @@ args = parser.parse_args()
 conf = literal_eval(open(args.config, 'r').read())
 conf_labelmap = {}
 for attr, patterns in conf['labelmap'].items():
-    conf_labelmap[attr] = {}
-    for pattern, labels in patterns.items():
-        conf_labelmap[attr][re.compile(pattern, re.IGNORECASE)] = labels
+    conf_labelmap[attr] = checkmkapi.PatternMatcher(patterns)
 
 mapi = checkmkapi.MultisiteAPI(args.url, args.username, args.password)
 wato = checkmkapi.CMKRESTAPI(args.url, args.username, args.password)
 
-resp = mapi.view(conf['view_name'], **conf.get('args', {}))
-
 if args.dump:
     #
     # get uniq values from view
     #
     result = {}
-    for info in resp:
+    for info in mapi.view_stream(conf['view_name'], **conf.get('args', {})):
         for key, value in info.items():
             if key not in result:
                 result[key] = set()
             result[key].add(value)
     pprint(result)
 else:
+    resp = mapi.view(conf['view_name'], **conf.get('args', {}))
     changes = False
     
     host_info = {}
@@ -67,23 +69,28 @@ else:
         host_info.setdefault(hostname, [])
         host_info[hostname].append(info)
 
-    for hostname, infos in host_info.items():
-        try:
-            host_labels, orig_labels, etag = get_host_labels(hostname)
-        except Exception:
-            raise
-        for info in infos:
-            for attr, patterns in conf_labelmap.items():
+    edits = []
+    for hostname, result in wato.get_hosts(list(host_info)).items():
+        if isinstance(result, Exception):
+            handle_error(hostname, result)
+            continue
+        host, etag = result
+        host_labels, orig_labels = get_host_labels(host)
+        for info in host_info[hostname]:
+            for attr, matcher in conf_labelmap.items():
                 if info.get(attr):
-                    for pattern, setlabels in patterns.items():
-                        if pattern.search(info[attr]):
-                            # set labels if pattern matches
-                            for label in setlabels:
-                                host_labels[u'%s%s' % (conf['label_prefix'][attr], label)] = conf['label_value'][attr]
+                    # set labels if pattern matches
+                    for setlabels in matcher.matches([info[attr]]):
+                        for label in setlabels:
+                            host_labels[u'%s%s' % (conf['label_prefix'][attr], label)] = conf['label_value'][attr]
 
         if host_labels != orig_labels:
             print("Setting labels for %s to %s (etag=%s)" % (hostname, host_labels, etag))
-            wato.edit_host(hostname, etag=etag, update_attr={'labels': host_labels})
+            edits.append({'hostname': hostname, 'etag': etag, 'update_attr': {'labels': host_labels}})
+    for edit, result in zip(edits, wato.parallel(wato.edit_host, edits)):
+        if isinstance(result, Exception):
+            handle_error(edit['hostname'], result)
+        else:
             changes = True
     if changes:
         wato.activate()
@@ -8,9 +8,10 @@
 
 import argparse # type: ignore
 import checkmkapi
+import os
 import re # type: ignore
 from ast import literal_eval # type: ignore
-from pprint import pprint # type: ignore
+from pprint import pprint, pformat # type: ignore
 
 parser = argparse.ArgumentParser()
 parser.add_argument('-s', '--url', help='URL to Check_MK site')
@@ -18,37 +19,32 @@ parser.add_argument('-u', '--username', help='name of the automation user')
 parser.add_argument('-p', '--password', help='secret of the automation user')
 parser.add_argument('-c', '--config', required=True, help='Path to config file')
 parser.add_argument('-d', '--dump', action="store_true", help='Dump unique values from the view')
+parser.add_argument('-i', '--incremental', metavar='STATEFILE', help='Only update hosts whose tags changed since the last run recorded in STATEFILE')
 args = parser.parse_args()
 
 conf = literal_eval(open(args.config, 'r').read())
 conf_tagmap = {}
 for attr, patterns in conf['tagmap'].items():
-    conf_tagmap[attr] = {}
-    for pattern, settags in patterns.items():
-        conf_tagmap[attr][re.compile(pattern, re.IGNORECASE)] = settags
+    conf_tagmap[attr] = checkmkapi.PatternMatcher(patterns)
 
 mapi = checkmkapi.MultisiteAPI(args.url, args.username, args.password)
 wato = checkmkapi.CMKRESTAPI(args.url, args.username, args.password)
 
-resp = mapi.view(conf['view_name'], **conf.get('args', {}))
-
 #
 # get uniq values from view
 #
 if args.dump:
     result = {}
-    for info in resp:
+    for info in mapi.view_stream(conf['view_name'], **conf.get('args', {})):
         for key, value in info.items():
             if key not in result:
                 result[key] = set()
             result[key].add(value)
     pprint(result)
 else:
+    resp = mapi.view(conf['view_name'], **conf.get('args', {}))
     changes = False
     host_info = {}
-    hosts, etags = wato.get_all_hosts(attributes=False)
-
-    # pprint(hosts)
 
     for info in resp:
         hostname = info['host']
@@ -59,52 +55,74 @@ else:
 
     # pprint(host_info)
 
+    desired_tags = {}
     for hostname, info in host_info.items():
-        try:
-            host, etag = wato.get_host(hostname)
-        except Exception:
-            raise
+        tags = {}
+        for attr, matcher in conf_tagmap.items():
+            if attr in info:
+                for settags in matcher.matches(info[attr]):
+                    tags.update(settags)
+        desired_tags[hostname] = tags
+
+    state = None
+    if args.incremental and os.path.exists(args.incremental):
+        state = literal_eval(open(args.incremental, 'r').read())
+
+    if state is None:
+        hosts, etags = wato.get_all_hosts(attributes=False)
+        update_hosts = list(desired_tags.keys())
+        unset_hosts = [ hostname for hostname in hosts if hostname not in desired_tags ]
+    else:
+        # only hosts whose desired tags differ from the last applied ones
+        update_hosts = [ hostname for hostname, tags in desired_tags.items() if state.get(hostname) != tags ]
+        unset_hosts = [ hostname for hostname, tags in state.items() if tags and hostname not in desired_tags ]
+
+    # pprint(update_hosts)
+    # pprint(unset_hosts)
+
+    watohosts = wato.get_hosts(update_hosts + unset_hosts)
+
+    for hostname in update_hosts:
+        if isinstance(watohosts[hostname], Exception):
+            raise watohosts[hostname]
+        host, etag = watohosts[hostname]
         # pprint(host)
         host_tags = host['extensions']['attributes']
         tags = {}
-        unset_tags = []
-        for attr, patterns in conf_tagmap.items():
-            if attr in info:
-                for pattern, settags in patterns.items():
-                    for value in info[attr]:
-                        if value and pattern.search(value):
-                            for taggroup, tag in settags.items():
-                                if host_tags.get(taggroup) != tag:
-                                    tags[taggroup] = tag
-        if tags or unset_tags:
+        for taggroup, tag in desired_tags[hostname].items():
+            if host_tags.get(taggroup) != tag:
+                tags[taggroup] = tag
+        if tags:
             # pprint(tags)
-            # pprint(unset_tags)
             wato.edit_host(hostname,
                            etag=etag,
-                           update_attr=tags,
-                           unset_attr=unset_tags)
+                           update_attr=tags)
             changes = True
-        if hostname in hosts:
-            del(hosts[hostname])
-
-    # pprint(hosts)
-    for hostname, url in hosts.items():
-        try:
-            host, etag = wato.get_host(hostname)
-        except Exception:
-            raise
+
+    for hostname in unset_hosts:
+        if isinstance(watohosts[hostname], Exception):
+            if state is not None:
+                # host has been removed since the last run
+                continue
+            raise watohosts[hostname]
+        host, etag = watohosts[hostname]
         # pprint(host)
         host_tags = list(host['extensions']['attributes'].keys())
         unset_tags = []
-        for attr, patterns in conf_tagmap.items():
-            for pattern, settags in patterns.items():
+        for attr, matcher in conf_tagmap.items():
+            for settags in matcher.results:
                 for taggroup, tag in settags.items():
-                    if taggroup in host_tags:
+                    if taggroup in host_tags and taggroup not in unset_tags:
                         unset_tags.append(taggroup)
         if unset_tags:
             # pprint(unset_tags)
             wato.edit_host(hostname, etag=etag, unset_attr=unset_tags)
             changes = True
-            
+
+    if args.incremental:
+        with open(args.incremental + '.new', 'w') as statefile:
+            statefile.write(pformat(desired_tags))
+        os.replace(args.incremental + '.new', args.incremental)
+
     if changes:
         wato.activate()
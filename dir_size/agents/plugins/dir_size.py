@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8; py-indent-offset: 4 -*-
+
+#
+# (c) 2026 Heinlein Consulting GmbH
+#          Robert Sander <r.sander@heinlein-support.de>
+#
+
+# This is free software;  you can redistribute it and/or modify it
+# under the  terms of the  GNU General Public License  as published by
+# the Free Software Foundation in version 2.  This file is distributed
+# in the hope that it will be useful, but WITHOUT ANY WARRANTY;  with-
+# out even the implied warranty of  MERCHANTABILITY  or  FITNESS FOR A
+# PARTICULAR PURPOSE. See the  GNU General Public License for more de-
+# ails.  You should have  received  a copy of the  GNU  General Public
+# License along with GNU Make; see the file  COPYING.  If  not,  write
+# to the Free Software Foundation, Inc., 51 Franklin St,  Fifth Floor,
+# Boston, MA 02110-1301 USA.
+
+#
+# Incremental variant of the dir_size agent plugin.
+#
+# Output is the same as "du -s" for every path in dir_size.cfg. The
+# disk usage of the files directly in a directory is cached together
+# with the directory's mtime in $MK_VARDIR/dir_size.cache. Only
+# directories whose mtime changed are listed again, unchanged ones are
+# just stat()ed. Files that grow in place do not change the mtime of
+# their directory, so a full scan is done every full_scan_interval
+# seconds (default one day). The configured paths are scanned in
+# parallel.
+#
+
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+def read_config(config_file):
+    paths = []
+    full_scan_interval = 86400
+    with open(config_file) as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if re.match(r'^/.*/', line):
+                paths.append(line)
+            elif line.startswith('full_scan_interval='):
+                full_scan_interval = int(line.split('=', 1)[1])
+    return paths, full_scan_interval
+
+def scan_dir(dirpath):
+    st = os.lstat(dirpath)
+    blocks = st.st_blocks
+    links = []
+    subdirs = []
+    with os.scandir(dirpath) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
+                est = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if est.st_nlink > 1:
+                # hard links are counted once like du does
+                links.append([est.st_dev, est.st_ino, est.st_blocks])
+            else:
+                blocks += est.st_blocks
+    return [st.st_mtime_ns, blocks, links, subdirs]
+
+def dir_size(path, cache, full_scan):
+    """returns size in KiB and the new cache entries for the tree below path"""
+    new_cache = {}
+    blocks = 0
+    seen = set()
+    stack = [path]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            entry = cache.get(dirpath)
+            if full_scan or not entry or entry[0] != os.lstat(dirpath).st_mtime_ns:
+                entry = scan_dir(dirpath)
+        except OSError:
+            continue
+        mtime, own, links, subdirs = entry
+        new_cache[dirpath] = entry
+        blocks += own
+        for dev, ino, link_blocks in links:
+            if (dev, ino) not in seen:
+                seen.add((dev, ino))
+                blocks += link_blocks
+        stack.extend(subdirs)
+    return (blocks + 1) // 2, new_cache
+
+def main():
+    config_file = os.path.join(os.environ.get("MK_CONFDIR", "/etc/check_mk"), "dir_size.cfg")
+    if not os.path.exists(config_file):
+        return
+    paths, full_scan_interval = read_config(config_file)
+
+    cache_file = os.path.join(os.environ.get("MK_VARDIR", "/var/lib/check_mk_agent"), "dir_size.cache")
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    dirs = cache.get("dirs", {})
+    last_full_scan = cache.get("last_full_scan", {})
+
+    now = time.time()
+    full_scan = {}
+    for path in paths:
+        full_scan[path] = now - last_full_scan.get(path, 0) >= full_scan_interval
+        if full_scan[path]:
+            last_full_scan[path] = now
+
+    results = {}
+    if paths:
+        with ThreadPoolExecutor(max_workers=min(len(paths), 8)) as executor:
+            for path, result in zip(paths, executor.map(lambda path: dir_size(path.rstrip('/') or '/', dirs, full_scan[path]), paths)):
+                results[path] = result
+
+    sys.stdout.write('<<<dir_size>>>\n')
+    new_dirs = {}
+    for path in paths:
+        size, new_cache = results[path]
+        new_dirs.update(new_cache)
+        if os.path.isdir(path):
+            sys.stdout.write('%d\t%s\n' % (size, path))
+
+    try:
+        with open(cache_file + '.new', 'w') as f:
+            json.dump({
+                "dirs": new_dirs,
+                "last_full_scan": dict((path, last_full_scan[path]) for path in paths),
+            }, f)
+        os.rename(cache_file + '.new', cache_file)
+    except OSError:
+        pass
+
+if __name__ == '__main__':
+    main()
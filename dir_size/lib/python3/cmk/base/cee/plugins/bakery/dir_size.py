@@ -23,11 +23,18 @@ from typing import Any, Dict
 from .bakery_api.v1 import FileGenerator, OS, Plugin, PluginConfig, register
 
 def get_dir_size_files(conf: Dict[str, Any]) -> FileGenerator:
-    yield Plugin(base_os=OS.LINUX,
-                 source=Path("dir_size"),
-                 interval=conf.get("interval"))
+    lines = list(conf.get("directories", []))
+    if "full_scan_interval" in conf:
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("dir_size.py"),
+                     interval=conf.get("interval"))
+        lines.append("full_scan_interval=%d" % conf["full_scan_interval"])
+    else:
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("dir_size"),
+                     interval=conf.get("interval"))
     yield PluginConfig(base_os=OS.LINUX,
-                       lines=conf.get("directories"),
+                       lines=lines,
                        target=Path("dir_size.cfg"),
                        include_header=True)
 
@@ -63,8 +63,16 @@ try:
                             label = _("Interval for collecting data"),
                             default_value = 300
                         )),
+                        ("full_scan_interval", Age(
+                            title = _("Incremental scan"),
+                            help = _("Deploy the Python 3 variant of the plugin that caches the size of every "
+                                     "subdirectory and only rescans directories whose modification time changed. "
+                                     "Files growing in place are only noticed by a full scan, which is done in this interval."),
+                            label = _("Interval for full scans"),
+                            default_value = 86400
+                        )),
                     ],
-                    optional_keys = ['interval'],
+                    optional_keys = ['interval', 'full_scan_interval'],
                 ),
                 FixedValue(None, title = _("Do not deploy the directory size plugin"), totext = _("(disabled)") ),
             ]
@@ -71,13 +71,16 @@ resp = requests.get(args.url, params={'_username': args.automation,
                                       '_secret': args.secret,
                                       'output_format': 'csv',
                                       '_transid': '-1',
-                                      'view_name': args.view})
+                                      'view_name': args.view},
+                    stream=True)
 if resp.status_code == 200:
     if args.debug:
-        print(resp.text)
+        for line in resp.iter_lines(decode_unicode=True):
+            print(line)
     else:
-        with open(args.output, 'w') as output:
-            output.write(resp.text)
-            output.write("\n")
+        with open(args.output, 'wb') as output:
+            for chunk in resp.iter_content(chunk_size=65536):
+                output.write(chunk)
+            output.write(b"\n")
 else:
     raise resp.text
@@ -12,9 +12,7 @@ from pprint import pprint
 
 label_prefix = "cluster/"
 
-def get_host_labels(hostname):
-    host, etag = wato.get_host(hostname)
-
+def get_host_labels(host, etag):
     orig_labels = host['extensions']['attributes'].get('labels', {})
     host_labels = {}
 
@@ -59,13 +57,13 @@ for item in resp:
 # pprint(hosts)
 
 changes = False
+watohosts = wato.get_hosts(hosts.keys())
 for hostname in hosts.keys():
     # pprint(hostname)
     
-    try:
-        host_labels, orig_labels, etag = get_host_labels(hostname)
-    except Exception:
-        raise
+    if isinstance(watohosts[hostname], Exception):
+        raise watohosts[hostname]
+    host_labels, orig_labels, etag = get_host_labels(*watohosts[hostname])
 
     # pprint(host_labels)
     # pprint(orig_labels)
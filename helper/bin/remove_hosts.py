@@ -23,33 +23,40 @@ cmk = checkmkapi.CMKRESTAPI(args.url, args.username, args.password)
 
 changes = False
 
-for hostname in sys.stdin.readlines():
-    hostname = hostname.strip()
-    if args.remove:
+def handle_error(hostname, er):
+    if isinstance(er, requests.exceptions.HTTPError) and er.response.status_code == 404:
+        print(f"{hostname} not found.")
+    else:
+        raise(er)
+
+hostnames = [ hostname.strip() for hostname in sys.stdin.readlines() ]
+
+if args.remove:
+    for hostname in hostnames:
         print(f"removing {hostname}.")
-        try:
-            cmk.delete_host(hostname)
+    for hostname, result in zip(hostnames, cmk.parallel(cmk.delete_host, hostnames)):
+        if isinstance(result, Exception):
+            handle_error(hostname, result)
+        else:
+            changes = True
+else:
+    edits = []
+    for hostname, result in cmk.get_hosts(hostnames).items():
+        if isinstance(result, Exception):
+            handle_error(hostname, result)
+            continue
+        host, etag = result
+        extensions = host.get("extensions", {})
+        attributes = extensions.get("attributes", {})
+        tag_criticality = attributes.get("tag_criticality")
+        if tag_criticality != "offline":
+            print(f"setting {hostname} to offline.")
+            edits.append({"hostname": hostname, "etag": etag, "update_attr": {"tag_criticality": "offline"}})
+    for edit, result in zip(edits, cmk.parallel(cmk.edit_host, edits)):
+        if isinstance(result, Exception):
+            handle_error(edit["hostname"], result)
+        else:
             changes = True
-        except requests.exceptions.HTTPError as er:
-            if er.response.status_code == 404:
-                print(f"{hostname} not found.")
-            else:
-                raise(er)
-    else:
-        try:
-            host, etag = cmk.get_host(hostname)
-            extensions = host.get("extensions", {})
-            attributes = extensions.get("attributes", {})
-            tag_criticality = attributes.get("tag_criticality")
-            if tag_criticality != "offline":
-                print(f"setting {hostname} to offline.")
-                cmk.edit_host(hostname, etag=etag, update_attr={"tag_criticality": "offline"})
-                changes = True
-        except requests.exceptions.HTTPError as er:
-            if er.response.status_code == 404:
-                print(f"{hostname} not found.")
-            else:
-                raise(er)
 
 if changes:
     print("activating changes.")
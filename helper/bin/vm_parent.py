@@ -49,11 +49,11 @@ for item in resp:
     hosts[item['host']] = node
 
 changes = False
+watohosts = wato.get_hosts(hosts.keys(), effective_attr=True)
 for host in hosts.keys():
-    try:
-        watohost, etag = wato.get_host(host, effective_attr=True)
-    except:
+    if isinstance(watohosts[host], Exception):
         continue
+    watohost, etag = watohosts[host]
     if watohost['extensions']['effective_attributes'].get('parents', []) != [ hosts[host] ]:
         if hosts[host]:
             print("%s gets %s as parent" % (host, hosts[host]))
@@ -70,15 +70,18 @@ def parse_kentix_devices(string_table):
             }
     for line in string_table[1]:
         section['zones'][line[0]] = {'name': line[1], 'armed': armed.get(line[2], False)}
+    # index the measurement tables by sensor ID, the last row wins
+    tables = {}
+    for key, val in meta.items():
+        tables[val] = { subline[0]: subline for subline in string_table[key] }
     for line in string_table[2]:
         sid = line[0]
         sensor = { 'info': line }
         sensor['type'] = line[2]
         sensor['zone'] = line[6]
-        for key, val in meta.items():
-            for subline in string_table[key]:
-                if subline[0] == sid:
-                    sensor[val] = subline
+        for val, table in tables.items():
+            if sid in table:
+                sensor[val] = table[sid]
         section['sensors']["%s %s" % (line[1], sid)] = sensor
     return section
 
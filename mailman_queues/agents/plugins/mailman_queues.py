@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8; py-indent-offset: 4 -*-
+
+#
+# (c) 2026 Heinlein Consulting GmbH
+#          Robert Sander <r.sander@heinlein-support.de>
+#
+
+# This is free software;  you can redistribute it and/or modify it
+# under the  terms of the  GNU General Public License  as published by
+# the Free Software Foundation in version 2.  This file is distributed
+# in the hope that it will be useful, but WITHOUT ANY WARRANTY;  with-
+# out even the implied warranty of  MERCHANTABILITY  or  FITNESS FOR A
+# PARTICULAR PURPOSE. See the  GNU General Public License for more de-
+# ails.  You should have  received  a copy of the  GNU  General Public
+# License along with GNU Make; see the file  COPYING.  If  not,  write
+# to the Free Software Foundation, Inc., 51 Franklin St,  Fifth Floor,
+# Boston, MA 02110-1301 USA.
+
+#
+# Python implementation of the mailman_queues agent plugin.
+#
+# Produces the same output as the shell plugin, every queue is walked
+# only once with spoolscan.py from lib/mailman_queues/ next to this
+# plugin. With TIMEOUT set in the configuration the walk stops after
+# that many seconds and the lines of unfinished queues end with
+# "partial".
+#
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib', 'mailman_queues'))
+import spoolscan
+
+def main():
+    conf = spoolscan.read_config(os.path.join(os.environ.get("MK_CONFDIR", "/etc/check_mk"), "mailman_queues"), {
+        'QPATH': '/var/lib/mailman/qfiles',
+        'QUEUES': 'bounces in out shunt',
+        'TIMEOUT': '',
+    })
+    qpath = conf['QPATH']
+    if not os.path.isdir(qpath):
+        return
+
+    until = spoolscan.deadline(conf['TIMEOUT'])
+
+    sys.stdout.write('<<<mailman_queues>>>\n')
+    for queue in conf['QUEUES'].split():
+        stats = spoolscan.scan('%s/%s' % (qpath, queue), until=until)
+        if stats:
+            sys.stdout.write('%s total all %d %d %s%s\n' % (queue, stats.count, stats.size, stats.path,
+                                                            ' partial' if stats.partial else ''))
+        else:
+            sys.stdout.write('%s total all 0\n' % queue)
+
+if __name__ == '__main__':
+    main()
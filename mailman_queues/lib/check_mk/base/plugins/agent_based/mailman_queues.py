@@ -39,6 +39,7 @@ def parse_mailman_queues(string_table):
     for line in string_table:
         section[mailman_queues_name(line)] = { 'mails': int(line[3]),
                                                'bytes': int(line[4]),
+                                               'partial': line[-1] == 'partial',
         }
     return section
 
@@ -58,6 +59,9 @@ def check_mailman_queues(item, section) -> CheckResult:
         rc = State.OK
         yield Result(state=rc,
                      summary="%d mails" % mails)
+        if section[item]['partial']:
+            yield Result(state=State.WARN,
+                         summary="Queue scan incomplete, time budget exceeded")
         yield Metric("length", mails)
         yield Metric("size", bytes)
 
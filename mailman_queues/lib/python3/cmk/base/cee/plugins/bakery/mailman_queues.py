@@ -21,13 +21,25 @@ from typing import Any, Dict
 from .bakery_api.v1 import FileGenerator, OS, Plugin, PluginConfig, register
 
 def get_mailman_queues_files(conf: Dict[str, Any]) -> FileGenerator:
-    yield Plugin(base_os=OS.LINUX,
-                 source=Path("mailman_queues"))
+    lines = []
+    if conf.get("implementation") == "python":
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("mailman_queues.py"))
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("lib/mailman_queues/spoolscan.py"),
+                     target=Path("lib/mailman_queues/spoolscan.py"))
+        if "timeout" in conf:
+            lines.append('TIMEOUT=%d' % conf["timeout"])
+    else:
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("mailman_queues"))
     if "queues" in conf:
-        yield PluginConf(base_os=OS.LINUX,
-                         lines=['QUEUES="%s"' % ' '.join(conf["queues"])],
-                         target=Path("mailman_queues"),
-                         include_header=True)
+        lines.append('QUEUES="%s"' % ' '.join(conf["queues"]))
+    if lines:
+        yield PluginConfig(base_os=OS.LINUX,
+                           lines=lines,
+                           target=Path("mailman_queues"),
+                           include_header=True)
 
 register.bakery_plugin(
     name="mailman_queues",
@@ -23,8 +23,10 @@ try:
     )
     from cmk.gui.cee.plugins.wato.agent_bakery.rulespecs.utils import RulespecGroupMonitoringAgentsAgentPlugins
     from cmk.gui.valuespec import (
+        Age,
         Alternative,
         Dictionary,
+        DropdownChoice,
         FixedValue,
         ListOfStrings,
         TextAscii,
@@ -53,8 +55,24 @@ try:
                            allow_empty = False,
                          )
                        ),
+                        ("implementation", DropdownChoice(
+                            title = _("Implementation"),
+                            help = _("The Python implementation walks every queue only once instead of "
+                                     "running find and du. It needs Python 3 on the host."),
+                            choices = [
+                                ("bash", _("Shell script")),
+                                ("python", _("Python 3 single pass")),
+                            ],
+                            default_value = "bash",
+                        )),
+                        ("timeout", Age(
+                            title = _("Time budget"),
+                            help = _("Only used by the Python implementation. The queues are not walked any "
+                                     "longer than this, incomplete results are reported as such."),
+                            default_value = 30,
+                        )),
                     ],
-                    optional_keys = ["queues"],
+                    optional_keys = ["queues", "implementation", "timeout"],
                 ),
                 FixedValue(None, title = _("Do not deploy the Mailman queues plugin"), totext = _("(disabled)") ),
             ]
@@ -30,16 +30,25 @@
 # and to monitor them. If this is not good for your environment you might
 # create an memcached.cfg file in MK_CONFDIR and populate the servers
 # list to prevent executing the detection mechanism.
+#
+# Detected instances are cached in MK_VARDIR for discovery_ttl seconds.
+# All instances are queried in parallel with one connection each. The
+# commands listed in extra_stats are sent on the same connection and
+# their output ends up in the sections memcached_slabs and memcached_items.
 
-import os, sys, re, socket
+import os, sys, re, socket, json, time
+from concurrent.futures import ThreadPoolExecutor
 
 # sample configuration:
 # instances = [
 #  ("localhost", 11211),
 #  ("localhost", 11212)
 # ]
+# discovery_ttl = 300
+# extra_stats = [ 'slabs', 'items' ]
 
 config_file=os.path.join(os.environ.get("MK_CONFDIR", "/etc/check_mk"), "memcached.cfg")
+cache_file=os.path.join(os.environ.get("MK_VARDIR", "/var/lib/check_mk_agent"), "memcached.cache")
 
 # We have to deal with socket timeouts. Python > 2.6
 # supports timeout parameter for the urllib2.urlopen method
@@ -49,9 +58,11 @@ socket.setdefaulttimeout(5.0)
 
 # None or list of (ipaddress, port) tuples.
 instances = None
+discovery_ttl = 300
+extra_stats = []
 
 if os.path.exists(config_file):
-    execfile(config_file)
+    exec(open(config_file).read())
 
 def parse_address_and_port(address_and_port):
     """
@@ -143,42 +154,75 @@ def try_detect_servers():
     
     return results
 
-def netcat(address, port, command):
+def cached_detect_servers():
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+        if time.time() - cache["time"] < discovery_ttl:
+            return [ tuple(instance) for instance in cache["instances"] ]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    results = try_detect_servers()
+    try:
+        with open(cache_file + '.new', 'w') as f:
+            json.dump({"time": time.time(), "instances": results}, f)
+        os.rename(cache_file + '.new', cache_file)
+    except OSError:
+        pass
+    return results
+
+def query(address, port, commands):
+    """sends all commands on one connection, returns the STAT lines per command"""
     if ':' in address:
         if address.startswith('[') and address.endswith(']'):
             address = address[1:-1]
         s = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
     else:
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.connect((address, port))
-    s.sendall(b'%b\r\n' % bytes(command, 'ascii'))
-    s.shutdown(socket.SHUT_WR)
-    res = b''
-    while 1:
-        data = s.recv(1024)
-        if data == b'':
-            break
-        res += data
-    s.close()
-    return str(res, 'ascii')
-
-if instances is None:
-    instances = try_detect_servers()
-
-if not instances:
-    sys.exit(0)
-
-print('<<<memcached>>>')
-for server in instances:
+    try:
+        s.connect((address, port))
+        s.sendall(b''.join(b'%b\r\n' % bytes(command, 'ascii') for command in commands + ['quit']))
+        res = bytearray()
+        while 1:
+            data = s.recv(65536)
+            if not data:
+                break
+            res += data
+    finally:
+        s.close()
+    results = [ [] ]
+    for line in str(res, 'ascii').split('\r\n'):
+        if line == 'END':
+            results.append([])
+        elif line.startswith('STAT '):
+            results[-1].append(line[5:])
+    return results[:len(commands)]
+
+def get_stats(server):
     if isinstance(server, tuple):
         address, port = server
     else:
         address = server['address']
         port = server['port']
-    print('[%s:%s]' % (address, port))
     try:
-        for line in netcat(address, port, 'stats').split('\r\n'):
-            if line.startswith('STAT '):
-                print(line[5:])
+        return address, port, query(address, port or 11211, ['stats'] + [ 'stats %s' % stat for stat in extra_stats ])
     except Exception as e:
         sys.stderr.write('Exception (%s:%s): %s\n' % (address, port, e))
+        return address, port, []
+
+if instances is None:
+    instances = cached_detect_servers()
+
+if not instances:
+    sys.exit(0)
+
+with ThreadPoolExecutor(max_workers=min(len(instances), 8)) as executor:
+    results = list(executor.map(get_stats, instances))
+
+for i, section in enumerate(['memcached'] + [ 'memcached_%s' % stat for stat in extra_stats ]):
+    print('<<<%s>>>' % section)
+    for address, port, stats in results:
+        print('[%s:%s]' % (address, port))
+        if i < len(stats):
+            for line in stats[i]:
+                print(line)
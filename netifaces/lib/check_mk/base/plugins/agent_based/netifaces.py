@@ -34,8 +34,12 @@ from .agent_based_api.v1 import (
 
 from typing import Any, MutableMapping
 
-from functools import reduce
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+import os
 import socket
+import threading
 import dns.reversename
 import ipaddress
 import time
@@ -45,30 +49,126 @@ _reverse_domain = {
     'inet6': dns.reversename.ipv6_reverse_domain,
 }
 
-def _get_cached_result(value_store: MutableMapping[str, Any], key: str, time: float, age: float):
-    last_state = value_store.get(key)
-    if not last_state or len(last_state) != 2:
-        return None
-    last_time, last_value = last_state
-    if (last_time + age) < time:
-        return None
-    return last_value
+def _lookup(ptr: str):
+    try:
+        return (0, socket.gethostbyname(ptr))
+    except socket.gaierror as er:
+        return (er.args[0], er.args[1])
 
-def _set_cached_result(value_store: MutableMapping[str, Any], key: str, time: float, value: Any):
-    value_store[key] = (time, value)    
+# All checks of a process share one pool of _LOOKUP_WORKERS threads. A
+# lookup that hangs in the resolver keeps its thread until the resolver
+# gives up. While the lookup for a name is still queued or running, no
+# second one is started, so hanging RBL servers cannot pile up threads.
+_LOOKUP_WORKERS = 16
+_executor = (None, None)
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+def _submit_lookup(ptr: str):
+    """returns the future of the lookup for ptr, reusing one in flight"""
+    global _executor
+    with _in_flight_lock:
+        if _executor[0] != os.getpid():
+            # the threads of a pool do not survive a fork
+            _executor = (os.getpid(), ThreadPoolExecutor(max_workers=_LOOKUP_WORKERS))
+            _in_flight.clear()
+        future = _in_flight.get(ptr)
+        if future is not None:
+            return future
+        future = _executor[1].submit(_lookup, ptr)
+        _in_flight[ptr] = future
+    # runs at once if the lookup is already done, so not under the lock
+    future.add_done_callback(lambda done: _forget_lookup(ptr, done))
+    return future
+
+def _forget_lookup(ptr: str, future):
+    with _in_flight_lock:
+        if _in_flight.get(ptr) is future:
+            del _in_flight[ptr]
+
+def _resolve(value_store: MutableMapping[str, Any], queries, params):
+    """looks up all (address, family, zone) queries concurrently
+
+    Returns {(address, zone): (errno, result)}. Results are cached in the
+    value store of the calling service per address and zone, listings for
+    cache_listed and everything else for cache_unlisted seconds, so the
+    RBL and SenderScore services do not share cached results. Temporary
+    failures are not cached. Lookups not finished within timeout seconds
+    are reported as EAI_AGAIN, they keep running in the shared pool and
+    are not started again until they are done."""
+    now = time.time()
+    results = {}
+    pending = {}
+    for addr, family, zone in queries:
+        key = "%s %s" % (addr, zone)
+        cached = value_store.get(key)
+        if cached and len(cached) == 3 and cached[0] > now:
+            results[(addr, zone)] = cached[1:]
+        else:
+            pending[(addr, zone)] = "%s.%s." % (dns.reversename.from_address(addr) - _reverse_domain[family], zone)
+    if pending:
+        futures = { _submit_lookup(ptr): query for query, ptr in pending.items() }
+        done, not_done = wait(futures, timeout=params.get('timeout', 5.0))
+        for future in done:
+            addr, zone = futures[future]
+            value = future.result()
+            results[(addr, zone)] = value
+            if value[0] == 0:
+                value_store["%s %s" % (addr, zone)] = (now + params.get('cache_listed', 600),) + value
+            elif value[0] != socket.EAI_AGAIN:
+                value_store["%s %s" % (addr, zone)] = (now + params.get('cache_unlisted', 3600),) + value
+        for future in not_done:
+            results[futures[future]] = (socket.EAI_AGAIN, 'timeout')
+    return results
+
+_address_index_cache = (None, {})
+
+def _address_index(ip_stats):
+    """returns {address: (interface, family)} for the lnx_if section
+
+    The index is kept for the last section object seen, so all checks
+    of one host share it within a check cycle."""
+    global _address_index_cache
+    if _address_index_cache[0] is not ip_stats:
+        index = {}
+        for iface, info in ip_stats.items():
+            for family in ["inet", "inet6"]:
+                for addr in map(lambda x: x.split('/')[0], getattr(info, family)):
+                    index.setdefault(addr, (iface, family))
+        _address_index_cache = (ip_stats, index)
+    return _address_index_cache[1]
+
+class _NetworkIndex:
+    """Sorted, merged address ranges of a list of networks
+
+    Membership of an address is tested with a binary search over the
+    ranges of its IP version."""
+
+    def __init__(self, networks):
+        self._ranges = {}
+        for version in [4, 6]:
+            nets = ipaddress.collapse_addresses(net for net in map(ipaddress.ip_network, networks) if net.version == version)
+            ranges = [ (int(net.network_address), int(net.broadcast_address)) for net in nets ]
+            self._ranges[version] = ([ r[0] for r in ranges ], [ r[1] for r in ranges ])
+
+    def __contains__(self, address):
+        starts, ends = self._ranges[address.version]
+        i = bisect_right(starts, int(address)) - 1
+        return i >= 0 and int(address) <= ends[i]
+
+@lru_cache(maxsize=32)
+def _network_index(networks):
+    return _NetworkIndex(networks)
 
 def discovery_netifaces(params, section) -> DiscoveryResult:
     if_table, ip_stats = section
     if params.get('active'):
-        include_list = list(map(ipaddress.ip_network, params.get('include', [])))
-        exclude_list = list(map(ipaddress.ip_network, params.get('exclude', [])))
+        include_index = _network_index(tuple(params.get('include', [])))
+        exclude_index = _network_index(tuple(params.get('exclude', [])))
         for iface, info in ip_stats.items():
             for addr in map(lambda x: x.split('/')[0], info.inet + info.inet6):
                 a = ipaddress.ip_address(addr)
-                if reduce(lambda result, network: result or (a in network), include_list, False):
-                    yield Service(item=addr)
-                    continue
-                if not reduce(lambda result, network: result or (a in network), exclude_list, False):
+                if a in include_index or a not in exclude_index:
                     yield Service(item=addr)
 
 def check_netifaces_rbl(item, params, section) -> CheckResult:
@@ -76,37 +176,31 @@ def check_netifaces_rbl(item, params, section) -> CheckResult:
                'crit': State.CRIT }
     if_table, ip_stats = section
     value_store = get_value_store()
-    for iface, info in ip_stats.items():
-        for family in ["inet", "inet6"]:
-            for addr in map(lambda x: x.split('/')[0], getattr(info, family)):
-                if item == addr:
+    index = _address_index(ip_stats)
+    if item in index:
+        addr = item
+        iface, family = index[item]
+        yield Result(state=State.OK,
+                     summary="bound on %s" % iface)
+        count = 0
+        zones = [ (rbl, levelres) for level, levelres in levels.items() for rbl in params.get(level, []) ]
+        results = _resolve(value_store, [ (addr, family, rbl) for rbl, levelres in zones ], params)
+        for rbl, levelres in zones:
+            value = results[(addr, rbl)]
+            if value[0] < 0:
+                if value[0] in [ socket.EAI_AGAIN, socket.EAI_NONAME ] :
                     yield Result(state=State.OK,
-                                 summary="bound on %s" % iface)
-                    count = 0
-                    for level, levelres in levels.items():
-                        for rbl in params.get(level, []):
-                            ptr = "%s.%s." % (dns.reversename.from_address(addr) - _reverse_domain[family], rbl)
-                            value = _get_cached_result(value_store, rbl, time.time(), 600)
-                            if not value:
-                                try:
-                                    value = (0, socket.gethostbyname(ptr))
-                                except socket.gaierror as er:
-                                    value = (er.args[0], er.args[1])
-                                _set_cached_result(value_store, rbl, time.time(), value)
-                            if value[0] < 0:
-                                if value[0] in [ socket.EAI_AGAIN, socket.EAI_NONAME ] :
-                                    yield Result(state=State.OK,
-                                                 notice='%s yields "%s"' % (rbl, value[1]))
-                                else:
-                                    yield Result(state=State.WARN,
-                                                 notice='%s yields %s' % (rbl, str(value)))
-                            else:
-                                count += 1
-                                yield Result(state=levelres,
-                                             notice='found in %s: %s' % (rbl, value[1]))
-                    if count > 1:
-                        yield Result(state=State.CRIT,
-                                     summary='found in more than 1 RBL')
+                                 notice='%s yields "%s"' % (rbl, value[1]))
+                else:
+                    yield Result(state=State.WARN,
+                                 notice='%s yields %s' % (rbl, str(value)))
+            else:
+                count += 1
+                yield Result(state=levelres,
+                             notice='found in %s: %s' % (rbl, value[1]))
+        if count > 1:
+            yield Result(state=State.CRIT,
+                         summary='found in more than 1 RBL')
 
 register.check_plugin(
     name="netifaces_rbl",
@@ -138,39 +232,32 @@ def check_netifaces_senderscore(item, params, section) -> CheckResult:
     if_table, ip_stats = section
     rbl = "score.senderscore.com"
     value_store = get_value_store()
-    for iface, info in ip_stats.items():
-        for family in ["inet", "inet6"]:
-            for addr in map(lambda x: x.split('/')[0], getattr(info, family)):
-                if item == addr:
-                    yield Result(state=State.OK,
-                                 summary="bound on %s" % iface)
-                    ptr = "%s.%s." % (dns.reversename.from_address(addr) - _reverse_domain[family], rbl)
-                    value = _get_cached_result(value_store, rbl, time.time(), 600)
-                    if not value:
-                        try:
-                            value = (0, socket.gethostbyname(ptr))
-                        except socket.gaierror as er:
-                            value = (er.args[0], er.args[1])
-                        _set_cached_result(value_store, rbl, time.time(), value)
-                    if value[0] < 0:
-                        if value[0] in [ socket.EAI_AGAIN, socket.EAI_NONAME ]:
-                            yield Result(state=State.OK,
-                                         notice='%s yields "%s"' % (rbl, value[1]))
-                        else:
-                            yield Result(state=State.WARN,
-                                         notice='%s yields %s' % (rbl, str(value)))
-                    else:
-                        ip = value[1]
-                        if ip.startswith("127.0.4."):
-                            score = int(ip[8:])
-                            yield from check_levels(
-                                score,
-                                levels_lower=params.get("score_levels"),
-                                metric_name="sender_score",
-                                boundaries=(0.0, 100.0),
-                                label="Sender Score",
-                                render_func=render.percent,
-                            )
+    index = _address_index(ip_stats)
+    if item in index:
+        addr = item
+        iface, family = index[item]
+        yield Result(state=State.OK,
+                     summary="bound on %s" % iface)
+        value = _resolve(value_store, [(addr, family, rbl)], params)[(addr, rbl)]
+        if value[0] < 0:
+            if value[0] in [ socket.EAI_AGAIN, socket.EAI_NONAME ]:
+                yield Result(state=State.OK,
+                             notice='%s yields "%s"' % (rbl, value[1]))
+            else:
+                yield Result(state=State.WARN,
+                             notice='%s yields %s' % (rbl, str(value)))
+        else:
+            ip = value[1]
+            if ip.startswith("127.0.4."):
+                score = int(ip[8:])
+                yield from check_levels(
+                    score,
+                    levels_lower=params.get("score_levels"),
+                    metric_name="sender_score",
+                    boundaries=(0.0, 100.0),
+                    label="Sender Score",
+                    render_func=render.percent,
+                )
 
 register.check_plugin(
     name="netifaces_senderscore",
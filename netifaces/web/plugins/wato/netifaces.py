@@ -3,7 +3,9 @@
 
 from cmk.gui.i18n import _
 from cmk.gui.valuespec import (
+    Age,
     Dictionary,
+    Float,
     Tuple,
     Integer,
     IPNetwork,
@@ -46,6 +48,26 @@ def _parameter_valuespec_netifaces_rbl():
                     default_value = ['ix.dnsbl.manitu.net', 'bl.spamcop.net', 'zen.spamhaus.org'],
                 ),
             ),
+            ( 'timeout',
+                Float(
+                    title = _('Timeout for all lookups'),
+                    help = _('All RBLs are queried in parallel. Lookups without an answer after this time are reported as unanswered.'),
+                    unit = _('seconds'),
+                    default_value = 5.0,
+                ),
+            ),
+            ( 'cache_listed',
+                Age(
+                    title = _('Cache time for listings'),
+                    default_value = 600,
+                ),
+            ),
+            ( 'cache_unlisted',
+                Age(
+                    title = _('Cache time for addresses not listed'),
+                    default_value = 3600,
+                ),
+            ),
         ],
     )
 
@@ -17,7 +17,9 @@
 
 from configparser import ConfigParser
 from mysql.connector.connection import MySQLConnection
+import json
 import os
+import time
 
 cfg = ConfigParser()
 # make option names case sensitive
@@ -25,40 +27,74 @@ cfg = ConfigParser()
 cfg.optionxform = str
 
 cfgdir = os.environ.get('MK_CONFDIR', '/etc/check_mk')
-cfg.read(os.path.join(cfgdir, 'otrs.cfg'))
+cfgfile = os.path.join(cfgdir, 'otrs.cfg')
+cfg.read(cfgfile)
 defaults = cfg.defaults()
 
-db = MySQLConnection(
-    host=defaults['dbhost'],
-    user=defaults['dbuser'],
-    password=defaults['dbpass'],
-    database=defaults['dbname']
-)
-cur = db.cursor()
+# the output is cached for cache_ttl seconds if configured
+cache_ttl = int(defaults.get('cache_ttl', 0) or 0)
+cachefile = os.path.join(os.environ.get('MK_VARDIR', '/var/lib/check_mk_agent'), 'otrs.cache')
 
-# fetch state names
-ticket_state = {}
-cur.execute('SELECT `id`, `name` FROM `ticket_state`')
-rows = cur.fetchall()
-for row in rows:
-    ticket_state[row[0]] = row[1]
+def get_lines():
+    db = MySQLConnection(
+        host=defaults['dbhost'],
+        user=defaults['dbuser'],
+        password=defaults['dbpass'],
+        database=defaults['dbname']
+    )
+    cur = db.cursor()
 
-print('<<<otrs>>>')
+    # fetch state names
+    ticket_state = {}
+    cur.execute('SELECT `id`, `name` FROM `ticket_state`')
+    rows = cur.fetchall()
+    for row in rows:
+        ticket_state[row[0]] = row[1]
+
+    # count the tickets of all configured queues per state in one query
+    queue_ids = sorted(set(int(cfg.get(section, 'id')) for section in cfg.sections()))
+    counts = {}
+    if queue_ids:
+        cur.execute('SELECT `queue_id`, `ticket_state_id`, COUNT(*) FROM `ticket` WHERE `queue_id` IN (%s) GROUP BY `queue_id`, `ticket_state_id`' % ', '.join(['%s'] * len(queue_ids)),
+                    queue_ids)
+        for queue_id, state_id, count in cur.fetchall():
+            counts[(int(queue_id), int(state_id))] = count
+    db.close()
 
-for section in cfg.sections():
-    queuename = section.replace(' ', '_')
-    if cfg.has_option(section, 'types'):
-        types = cfg.get(section, 'types')
+    lines = []
+    for section in cfg.sections():
+        queuename = section.replace(' ', '_')
+        queue_id = int(cfg.get(section, 'id'))
+        types = ''
+        if cfg.has_option(section, 'types'):
+            types = cfg.get(section, 'types')
         if types != '':
             for typeid in types.split():
-                cur.execute("SELECT COUNT(*) FROM `ticket` WHERE `queue_id` = '%s' AND `ticket_state_id` = '%s'" % (cfg.get(section, 'id'), typeid))
-                count = cur.fetchone()[0]
-                print(queuename, typeid, count, ticket_state[int(typeid)])
+                lines.append('%s %s %d %s' % (queuename, typeid, counts.get((queue_id, int(typeid)), 0), ticket_state[int(typeid)]))
         else:
-            cur.execute("SELECT COUNT(*) FROM `ticket` WHERE `queue_id` = '%s'" % (cfg.get(section, 'id')))
-            count = cur.fetchone()[0]
-            print(queuename, 0, count, 'all')
-    else:
-        cur.execute("SELECT COUNT(*) FROM `ticket` WHERE `queue_id` = '%s'" % (cfg.get(section, 'id')))
-        count = cur.fetchone()[0]
-        print(queuename, 0, count, 'all')
+            lines.append('%s 0 %d all' % (queuename, sum(count for (qid, state_id), count in counts.items() if qid == queue_id)))
+    return lines
+
+lines = None
+if cache_ttl > 0:
+    try:
+        with open(cachefile) as f:
+            cache = json.load(f)
+        if time.time() - cache['time'] < cache_ttl and cache['config'] == os.stat(cfgfile).st_mtime:
+            lines = cache['lines']
+    except (OSError, ValueError, KeyError):
+        pass
+
+if lines is None:
+    lines = get_lines()
+    if cache_ttl > 0:
+        try:
+            with open(cachefile + '.new', 'w') as f:
+                json.dump({'time': time.time(), 'config': os.stat(cfgfile).st_mtime, 'lines': lines}, f)
+            os.rename(cachefile + '.new', cachefile)
+        except OSError:
+            pass
+
+print('<<<otrs>>>')
+for line in lines:
+    print(line)
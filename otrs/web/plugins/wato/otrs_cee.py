@@ -31,12 +31,16 @@ try:
                         ( "defaults",
                           Dictionary(
                               title = _("DB connection and default types."),
-                              optional_keys = [],
+                              optional_keys = ['cache_ttl'],
                               elements = [
                                   ( 'dbhost', TextAscii(title = _("Hostname"), default_value='localhost') ),
                                   ( 'dbname', TextAscii(title = _("DB-Name"), default_value='otrs') ),
                                   ( 'dbuser', TextAscii(title = _("DB-User"), default_value='otrs') ),
                                   ( 'dbpass', Password(title = _("Password")) ),
+                                  ( 'cache_ttl', Age(
+                                      title = _("Cache the ticket counts"),
+                                      help = _("The result of the database query is reused for this time to reduce the load on the OTRS database."),
+                                      default_value = 300) ),
                               ]
                           )
                         ),
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8; py-indent-offset: 4 -*-
+
+#
+# (c) 2026 Heinlein Consulting GmbH
+#          Robert Sander <r.sander@heinlein-support.de>
+#
+
+# This is free software;  you can redistribute it and/or modify it
+# under the  terms of the  GNU General Public License  as published by
+# the Free Software Foundation in version 2.  This file is distributed
+# in the hope that it will be useful, but WITHOUT ANY WARRANTY;  with-
+# out even the implied warranty of  MERCHANTABILITY  or  FITNESS FOR A
+# PARTICULAR PURPOSE. See the  GNU General Public License for more de-
+# ails.  You should have  received  a copy of the  GNU  General Public
+# License along with GNU Make; see the file  COPYING.  If  not,  write
+# to the Free Software Foundation, Inc., 51 Franklin St,  Fifth Floor,
+# Boston, MA 02110-1301 USA.
+
+#
+# Queue walker shared by the Python mail queue agent plugins
+# (postfix_mailq_details.py, mailman_queues.py, zimbra_mailq.py).
+#
+# A spool directory is walked once and the number of files, their
+# apparent size like "du -sb", their disk usage like "du -sk" and the
+# number and size of files per "find -cmin" age class are collected in
+# that single pass. An optional deadline stops the walk early, the
+# result is then marked as partial.
+#
+# Every plugin using it ships it in plugins/lib/<plugin>/, which the
+# agent does not execute, and adds that directory to sys.path. This
+# file in postfix_mailq_details is the only source, the files in
+# mailman_queues and zimbra are symlinks to it. Called with directories
+# as arguments it prints their statistics.
+#
+
+import os
+import sys
+import time
+
+def read_config(config_file, conf):
+    """reads the shell variable assignments for the keys in conf"""
+    if os.access(config_file, os.R_OK):
+        with open(config_file) as f:
+            for line in f:
+                line = line.strip()
+                if '=' not in line or line.startswith('#'):
+                    continue
+                key, value = line.split('=', 1)
+                if key in conf:
+                    if len(value) > 1 and value[0] == value[-1] and value[0] in '"\'':
+                        value = value[1:-1]
+                    conf[key] = value
+    return conf
+
+def deadline(timeout):
+    """returns the deadline for a time budget in seconds, None if there is no budget"""
+    try:
+        timeout = float(timeout)
+    except (TypeError, ValueError):
+        return None
+    if timeout > 0:
+        return time.monotonic() + timeout
+
+def age_test(age):
+    """returns a function testing the ctime of a file like "find -cmin age" """
+    minutes = int(age.lstrip('+-'))
+    if age.startswith('+'):
+        return lambda seconds: seconds > minutes * 60
+    if age.startswith('-'):
+        return lambda seconds: seconds < minutes * 60
+    return lambda seconds: (minutes - 1) * 60 < seconds <= minutes * 60
+
+class QueueStats():
+    """Statistics of one spool directory
+
+    count and size are the number and apparent size of the files, size
+    also contains the directories like "du -sb" does. blocks is the disk
+    usage in 512 byte blocks. ages holds a [count, size] pair for every
+    age class. partial is set if the deadline passed before the walk
+    finished.
+    """
+
+    def __init__(self, path, ages=[]):
+        self.path = path
+        self.ages = dict((age, [0, 0]) for age in ages)
+        self.count = 0
+        self.size = 0
+        self.blocks = 0
+        self.partial = False
+
+    @property
+    def kbytes(self):
+        return (self.blocks + 1) // 2
+
+def scan(path, ages=[], until=None):
+    """walks the queue at path once
+
+    ages is a list of "find -cmin" arguments. Returns the QueueStats or
+    None if the queue does not exist. until is a deadline as returned by
+    deadline()."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    stats = QueueStats(path, ages)
+    stats.size = st.st_size
+    stats.blocks = st.st_blocks
+    if until is not None and time.monotonic() > until:
+        stats.partial = True
+        return stats
+    now = time.time()
+    tests = [ (age_test(age), stats.ages[age]) for age in stats.ages ]
+    seen = set()
+    stack = [path]
+    entries = 0
+    while stack and not stats.partial:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                entries += 1
+                if until is not None and entries % 1000 == 0 and time.monotonic() > until:
+                    stats.partial = True
+                    break
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stats.size += st.st_size
+                    stats.blocks += st.st_blocks
+                    stack.append(entry.path)
+                    continue
+                size = st.st_size
+                if st.st_nlink > 1:
+                    # hard links are counted once like du does
+                    if (st.st_dev, st.st_ino) in seen:
+                        size = 0
+                    else:
+                        stats.blocks += st.st_blocks
+                    seen.add((st.st_dev, st.st_ino))
+                else:
+                    stats.blocks += st.st_blocks
+                stats.size += size
+                if entry.is_file(follow_symlinks=False):
+                    stats.count += 1
+                    for test, bucket in tests:
+                        if test(now - st.st_ctime):
+                            bucket[0] += 1
+                            bucket[1] += size
+    return stats
+
+if __name__ == '__main__':
+    for path in sys.argv[1:]:
+        stats = scan(path)
+        if stats:
+            sys.stdout.write('%s %d files %d bytes %d kbytes\n' % (path, stats.count, stats.size, stats.kbytes))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8; py-indent-offset: 4 -*-
+
+#
+# (c) 2026 Heinlein Consulting GmbH
+#          Robert Sander <r.sander@heinlein-support.de>
+#
+
+# This is free software;  you can redistribute it and/or modify it
+# under the  terms of the  GNU General Public License  as published by
+# the Free Software Foundation in version 2.  This file is distributed
+# in the hope that it will be useful, but WITHOUT ANY WARRANTY;  with-
+# out even the implied warranty of  MERCHANTABILITY  or  FITNESS FOR A
+# PARTICULAR PURPOSE. See the  GNU General Public License for more de-
+# ails.  You should have  received  a copy of the  GNU  General Public
+# License along with GNU Make; see the file  COPYING.  If  not,  write
+# to the Free Software Foundation, Inc., 51 Franklin St,  Fifth Floor,
+# Boston, MA 02110-1301 USA.
+
+#
+# Python implementation of the postfix_mailq_details agent plugin.
+#
+# Produces the same output as the shell plugin, but every queue is
+# walked only once with spoolscan.py from lib/postfix_mailq_details/
+# next to this plugin. The number of files, the apparent size like
+# "du -sb" and the number and size of files matching the configured
+# "find -cmin" age are all collected in that single pass.
+#
+# With TIMEOUT set in the configuration the walk stops after that many
+# seconds and the lines of unfinished queues end with "partial".
+#
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib', 'postfix_mailq_details'))
+import spoolscan
+
+def main():
+    conf = spoolscan.read_config(os.path.join(os.environ.get("MK_CONFDIR", "/etc/check_mk"), "postfix_mailq_details"), {
+        'QPATH': '/var/spool/postfix',
+        'AGE1': '+5',
+        'AGE2': '-5',
+        'QUEUES1': 'active incoming',
+        'QUEUES2': 'deferred',
+        'TIMEOUT': '',
+    })
+    qpath = conf['QPATH']
+    if not os.path.isdir(qpath):
+        return
+
+    queue_ages = [ (queue, conf['AGE1']) for queue in conf['QUEUES1'].split() ] + \
+                 [ (queue, conf['AGE2']) for queue in conf['QUEUES2'].split() ]
+
+    ages = {}
+    for queue, age in queue_ages:
+        ages.setdefault(queue, []).append(age)
+
+    until = spoolscan.deadline(conf['TIMEOUT'])
+    results = {}
+    for queue, age in queue_ages:
+        if queue not in results:
+            results[queue] = spoolscan.scan('%s/%s' % (qpath, queue), ages[queue], until)
+
+    sys.stdout.write('<<<postfix_mailq_details>>>\n')
+    for queue, age in queue_ages:
+        stats = results[queue]
+        if stats:
+            sys.stdout.write('%s total all %d %d %s%s\n' % (queue, stats.count, stats.size, stats.path,
+                                                            ' partial' if stats.partial else ''))
+        else:
+            sys.stdout.write('%s total all 0\n' % queue)
+
+    for queue, age in queue_ages:
+        stats = results[queue]
+        if stats:
+            length, size = stats.ages[age]
+            sys.stdout.write('%s age %s %d %d%s\n' % (queue, age, length, size,
+                                                      ' partial' if stats.partial else ''))
+        else:
+            sys.stdout.write('%s age %s 0 0\n' % (queue, age))
+
+if __name__ == '__main__':
+    main()
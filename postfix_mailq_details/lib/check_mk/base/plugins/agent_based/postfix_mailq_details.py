@@ -46,10 +46,11 @@ def parse_postfix_mailq_details(string_table):
             bytes = int(line[4])
         except:
             bytes = 0
+        partial = line[-1] == 'partial'
         if line[1] == 'age':
-            data = (line[2], mails, bytes)
+            data = (line[2], mails, bytes, partial)
         if line[1] == 'total' and line[2] == 'all':
-            data = (line[5], mails, bytes)
+            data = (line[5], mails, bytes, partial)
         section[item] = data
     return section
 
@@ -73,6 +74,9 @@ def check_postfix_mailq_details(item, params, section):
                 label_text = "Mails younger than %s minutes" % section[item][0][1:]
         else:
             label_text = "Mails"
+        if section[item][3]:
+            yield Result(state=State.WARN,
+                         summary="Queue scan incomplete, time budget exceeded")
         yield Metric("size", bytes)
         yield from check_levels(
             mails,
@@ -21,11 +21,20 @@ from typing import Any, Dict
 from .bakery_api.v1 import FileGenerator, OS, Plugin, PluginConfig, register
 
 def get_postfix_mailq_details_files(conf: Dict[str, Any]) -> FileGenerator:
-    yield Plugin(base_os=OS.LINUX,
-                 source=Path("postfix_mailq_details"))
+    lines = []
+    if conf.get("implementation") == "python":
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("postfix_mailq_details.py"))
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("lib/postfix_mailq_details/spoolscan.py"),
+                     target=Path("lib/postfix_mailq_details/spoolscan.py"))
+        if "timeout" in conf:
+            lines.append('TIMEOUT=%d' % conf["timeout"])
+    else:
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("postfix_mailq_details"))
 
     prefixes = { '1': '+', '2': '-' }
-    lines = []
 
     for group, prefix in prefixes.items():
         if group in conf:
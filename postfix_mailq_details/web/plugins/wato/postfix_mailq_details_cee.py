@@ -12,6 +12,7 @@ try:
         Age,
         Alternative,
         Dictionary,
+        DropdownChoice,
         FixedValue,
         ListOfStrings,
         TextAscii,
@@ -46,6 +47,22 @@ try:
                             ]
                           )
                         ),
+                        ("implementation", DropdownChoice(
+                            title = _("Implementation"),
+                            help = _("The Python implementation walks every queue only once instead of "
+                                     "running find and du several times. It needs Python 3 on the host."),
+                            choices = [
+                                ("bash", _("Shell script")),
+                                ("python", _("Python 3 single pass")),
+                            ],
+                            default_value = "bash",
+                        )),
+                        ("timeout", Age(
+                            title = _("Time budget"),
+                            help = _("Only used by the Python implementation. The queues are not walked any "
+                                     "longer than this, incomplete results are reported as such."),
+                            default_value = 30,
+                        )),
                     ],
                 ),
                 FixedValue(None, title = _("Do not deploy the Postfix queue details plugin"), totext = _("disabled")),
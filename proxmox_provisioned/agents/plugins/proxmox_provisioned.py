@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8; py-indent-offset: 4 -*-
+
+#
+# (c) 2026 Heinlein Consulting GmbH
+#          Robert Sander <r.sander@heinlein-support.de>
+#
+
+# This is free software;  you can redistribute it and/or modify it
+# under the  terms of the  GNU General Public License  as published by
+# the Free Software Foundation in version 2.  This file is distributed
+# in the hope that it will be useful, but WITHOUT ANY WARRANTY;  with-
+# out even the implied warranty of  MERCHANTABILITY  or  FITNESS FOR A
+# PARTICULAR PURPOSE. See the  GNU General Public License for more de-
+# ails.  You should have  received  a copy of the  GNU  General Public
+# License along with GNU Make; see the file  COPYING.  If  not,  write
+# to the Free Software Foundation, Inc., 51 Franklin St,  Fifth Floor,
+# Boston, MA 02110-1301 USA.
+
+#
+# Python implementation of the proxmox_provisioned agent plugin.
+#
+# Produces the same output as the shell plugin. The virtual size of
+# every image is cached in $MK_VARDIR/proxmox_provisioned.cache keyed
+# by path, mtime and size, only new or changed images are inspected.
+# The virtual size is read from the header of qcow2 images, raw images
+# have their file size, only other formats need "qemu-img info". The
+# storages are scanned in parallel.
+#
+
+import json
+import os
+import re
+import shutil
+import struct
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+QCOW2_MAGIC = b'QFI\xfb'
+
+def read_storages(storage_cfg):
+    storages = []
+    dstype = dsname = None
+    with open(storage_cfg) as f:
+        for line in f:
+            words = line.split(None, 1)
+            if not words:
+                continue
+            key = words[0]
+            value = words[1].strip() if len(words) > 1 else ''
+            match = re.match(r'^(\S+):\s*(.*)$', ('%s %s' % (key, value)).strip())
+            if match:
+                dstype, dsname = match.groups()
+            elif key == 'path' and dstype in ('dir', 'nfs'):
+                storages.append(('dir', dsname, value))
+            elif key == 'pool' and dstype == 'zfspool':
+                storages.append(('zfs', dsname, value))
+    return storages
+
+def run(cmd):
+    return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                          universal_newlines=True).stdout
+
+def virtual_size(image):
+    with open(image, 'rb') as f:
+        header = f.read(32)
+    if len(header) == 32 and header[:4] == QCOW2_MAGIC:
+        return struct.unpack('>Q', header[24:32])[0]
+    if image.endswith('.raw'):
+        return os.path.getsize(image)
+    try:
+        return int(json.loads(run(['qemu-img', 'info', '--output=json', image]))['virtual-size'])
+    except (ValueError, KeyError):
+        return 0
+
+def scan_images(images, cache, new_cache):
+    """returns the disk usage like "du -s" and the provisioned size of all images"""
+    used = 0
+    prov = 0
+    seen = set()
+    stack = [images]
+    try:
+        used = os.lstat(images).st_blocks * 512
+    except OSError:
+        pass
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if st.st_nlink < 2 or entry.is_dir(follow_symlinks=False) or (st.st_dev, st.st_ino) not in seen:
+                    # hard links are counted once like du does
+                    seen.add((st.st_dev, st.st_ino))
+                    used += st.st_blocks * 512
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    key = [st.st_mtime, st.st_size]
+                    cached = cache.get(entry.path)
+                    if cached and cached[:2] == key:
+                        size = cached[2]
+                    else:
+                        try:
+                            size = virtual_size(entry.path)
+                        except OSError:
+                            continue
+                    new_cache[entry.path] = key + [size]
+                    prov += size
+    return used, prov
+
+def handle_dir_storage(dsname, path, cache, new_cache):
+    images = os.path.join(path, 'images')
+    if not os.path.isdir(images):
+        return []
+    df = run(['df', '-T', '-B', '1', path]).splitlines()[-1].split()
+    typ, capacity, total_used = df[1], int(df[2]), int(df[3])
+    used, prov = scan_images(images, cache, new_cache)
+    total_cap = capacity - total_used + used
+    return [
+        '[%s]' % dsname,
+        'url %s' % path,
+        'accessible True',
+        'type %s' % typ,
+        'capacity %d' % total_cap,
+        'freeSpace %d' % (total_cap - used),
+        'uncommitted %d' % (prov - used if prov > 0 else 0),
+    ]
+
+def handle_zfs_storage(dsname, pool):
+    if not shutil.which('zfs'):
+        return []
+    free = int(run(['zfs', 'get', '-Hpo', 'value', 'available', pool]))
+    used = int(run(['zfs', 'get', '-Hpo', 'value', 'used', pool]))
+    prov = sum(int(value) for value in run(['zfs', 'get', '-rHpo', 'value', 'volsize', pool]).split() if value != '-')
+    return [
+        '[%s]' % dsname,
+        'url %s' % pool,
+        'accessible True',
+        'type ZFS',
+        'capacity %d' % (free + used),
+        'freeSpace %d' % free,
+        'uncommitted %d' % (prov - used if prov > 0 else 0),
+    ]
+
+def handle_storage(storage, cache, new_cache):
+    kind, dsname, value = storage
+    try:
+        if kind == 'dir':
+            return handle_dir_storage(dsname, value, cache, new_cache)
+        return handle_zfs_storage(dsname, value)
+    except (OSError, ValueError, IndexError) as e:
+        sys.stderr.write('%s: %s\n' % (dsname, e))
+        return []
+
+def main():
+    if os.access('/etc/pve/storage.cfg', os.R_OK):
+        cache_file = os.path.join(os.environ.get("MK_VARDIR", "/var/lib/check_mk_agent"), "proxmox_provisioned.cache")
+        try:
+            with open(cache_file) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        new_cache = {}
+
+        storages = read_storages('/etc/pve/storage.cfg')
+        sys.stdout.write('<<<esx_vsphere_datastores>>>\n')
+        if storages:
+            with ThreadPoolExecutor(max_workers=min(len(storages), 8)) as executor:
+                for lines in executor.map(lambda storage: handle_storage(storage, cache, new_cache), storages):
+                    for line in lines:
+                        sys.stdout.write(line + '\n')
+
+        try:
+            with open(cache_file + '.new', 'w') as f:
+                json.dump(new_cache, f)
+            os.rename(cache_file + '.new', cache_file)
+        except OSError:
+            pass
+
+    pvesm = shutil.which('pvesm')
+    if pvesm:
+        sys.stdout.write('<<<esx_vsphere_datastores>>>\n')
+        for line in run([pvesm, 'status']).splitlines():
+            if 'lvm' not in line:
+                continue
+            dsname, typ, status, total_cap, used, avail = line.split()[:6]
+            sys.stdout.write('[%s]\n' % dsname)
+            sys.stdout.write('accessible %s\n' % ('True' if status == 'active' else 'False'))
+            sys.stdout.write('type %s\n' % typ)
+            sys.stdout.write('capacity %d\n' % (int(total_cap) * 1024))
+            sys.stdout.write('freeSpace %d\n' % (int(avail) * 1024))
+            sys.stdout.write('uncommitted 0\n')
+
+if __name__ == '__main__':
+    main()
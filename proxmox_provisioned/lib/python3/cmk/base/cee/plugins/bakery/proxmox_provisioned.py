@@ -21,9 +21,14 @@ from typing import Any, Dict
 from .bakery_api.v1 import FileGenerator, OS, Plugin, PluginConfig, register
 
 def get_proxmox_provisioned_files(conf: Dict[str, Any]) -> FileGenerator:
-    yield Plugin(base_os=OS.LINUX,
-                 source=Path("proxmox_provisioned"),
-                 interval=conf.get("interval"))
+    if conf.get("implementation") == "python":
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("proxmox_provisioned.py"),
+                     interval=conf.get("interval"))
+    else:
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("proxmox_provisioned"),
+                     interval=conf.get("interval"))
 
 register.bakery_plugin(
     name="proxmox_provisioned",
@@ -5,8 +5,10 @@ try:
     from cmk.gui.i18n import _
     from cmk.gui.cee.plugins.wato.agent_bakery.rulespecs.utils import RulespecGroupMonitoringAgentsAgentPlugins
     from cmk.gui.valuespec import (
+        Age,
         Alternative,
         Dictionary,
+        DropdownChoice,
         FixedValue,
     )
     from cmk.gui.plugins.wato import (
@@ -28,6 +30,16 @@ try:
                             label = _("Interval for collecting data"),
                             default_value = 300
                         )),
+                        ("implementation", DropdownChoice(
+                            title = _("Implementation"),
+                            help = _("The Python implementation caches the virtual size of every image and "
+                                     "only inspects new or changed images. It needs Python 3 on the host."),
+                            choices = [
+                                ("bash", _("Shell script")),
+                                ("python", _("Python 3 with cache")),
+                            ],
+                            default_value = "bash",
+                        )),
                     ],
                 ),
                 FixedValue(None, title = _("Do not deploy plugin for Proxmox Storage"), totext = _("(disabled)") ),
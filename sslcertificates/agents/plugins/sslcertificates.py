@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8; py-indent-offset: 4 -*-
+
+#
+# (c) 2026 Heinlein Consulting GmbH
+#          Robert Sander <r.sander@heinlein-support.de>
+#
+
+# This is free software;  you can redistribute it and/or modify it
+# under the  terms of the  GNU General Public License  as published by
+# the Free Software Foundation in version 2.  This file is distributed
+# in the hope that it will be useful, but WITHOUT ANY WARRANTY;  with-
+# out even the implied warranty of  MERCHANTABILITY  or  FITNESS FOR A
+# PARTICULAR PURPOSE. See the  GNU General Public License for more de-
+# ails.  You should have  received  a copy of the  GNU  General Public
+# License along with GNU Make; see the file  COPYING.  If  not,  write
+# to the Free Software Foundation, Inc., 51 Franklin St,  Fifth Floor,
+# Boston, MA 02110-1301 USA.
+
+#
+# Python implementation of the sslcertificates agent plugin.
+#
+# Produces the same output as the shell plugin but runs in one process
+# and remembers the output line of every file keyed by path, mtime and
+# size in $MK_VARDIR/sslcertificates.cache. Only new or changed files
+# are handed to openssl, which is still used so that subject, issuer
+# and issuer hash are formatted exactly as before. One openssl call
+# prints all fields of a file. Files are listed in the collation order
+# of the shell glob.
+#
+
+import calendar
+import glob
+import json
+import locale
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+def get_cert_dirs():
+    cert_dirs = "/etc/ssl/certs"
+    config_file = os.path.join(os.environ.get("MK_CONFDIR", "/etc/check_mk"), "sslcertificates")
+    if os.access(config_file, os.R_OK):
+        with open(config_file) as f:
+            for line in f:
+                match = re.match(r'^\s*CERT_DIRS=(["\']?)(.*)\1\s*$', line)
+                if match:
+                    cert_dirs = match.group(2)
+    return cert_dirs.split()
+
+def glob_sorted(pattern):
+    # bash sorts pathname expansions with strcoll()
+    return sorted(glob.glob(pattern), key=locale.strxfrm)
+
+def get_cert_files(cert_dirs):
+    for pattern in cert_dirs:
+        paths = glob_sorted(pattern) if glob.has_magic(pattern) else []
+        for path in paths or [pattern]:
+            if os.path.isdir(path):
+                for certfile in glob_sorted(os.path.join(path, '*')):
+                    yield certfile, False
+            else:
+                yield path, True
+
+def wanted(certfile, single):
+    if not os.path.isfile(certfile) or not os.access(certfile, os.R_OK):
+        return False
+    if os.path.islink(certfile) and not single:
+        return False
+    return not (certfile.endswith('~') or
+                certfile.endswith('_CA.crt') or
+                certfile.endswith('/ca-certificates.crt'))
+
+def to_epoch(date):
+    # e.g. "May  5 09:37:37 2011 GMT"
+    month, day, clock, year = date.split()[:4]
+    hour, minute, second = clock.split(':')
+    return calendar.timegm((int(year), MONTHS.index(month) + 1, int(day),
+                            int(hour), int(minute), int(second)))
+
+def escape_msb(name):
+    # openssl's default name format escapes non ASCII bytes as \XX
+    return ''.join(c if ord(c) < 128 else ''.join('\\%02X' % b for b in c.encode('utf-8'))
+                   for c in name)
+
+def get_cert_info(openssl_bin, certfile):
+    with open(certfile, 'rb') as f:
+        inform = 'PEM' if b'-----BEGIN CERTIFICATE-----' in f.read() else 'DER'
+
+    proc = subprocess.run([openssl_bin, 'x509', '-inform', inform, '-noout', '-nameopt', 'utf8',
+                           '-subject', '-issuer', '-startdate', '-enddate', '-issuer_hash', '-text',
+                           '-in', certfile],
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL)
+    if proc.returncode != 0:
+        return None
+    fields = {}
+    for line in proc.stdout.decode('utf-8', 'replace').splitlines():
+        if '=' in line and line.split('=', 1)[0] in ('subject', 'issuer', 'notBefore', 'notAfter'):
+            key, value = line.split('=', 1)
+            fields.setdefault(key, value)
+        elif re.match(r'^[0-9a-f]{8}$', line):
+            fields.setdefault('issuer_hash', line)
+        elif 'Signature Algorithm: ' in line and 'algosign' not in fields:
+            words = line.split()
+            fields['algosign'] = words[2] if len(words) > 2 else ''
+
+    subject = fields['subject'].replace('"', '\\"')
+    if '@snakeoil.dom' in subject:
+        return None
+    startdate = to_epoch(fields['notBefore'])
+    enddate = to_epoch(fields['notAfter'])
+    issuer_hash = fields['issuer_hash']
+    # the shell plugin prints the issuer without -nameopt utf8
+    issuer = escape_msb(fields['issuer']).replace(' = ', '=').replace(', ', ',').replace('"', '')
+    algosign = fields.get('algosign', '')
+
+    return '{"file": "%s", "starts": %d, "expires": %d, "algosign": "%s", "issuer_hash": "%s", "issuer": "%s", "subj": "%s"}' % (
+        certfile, startdate, enddate, algosign, issuer_hash, issuer, subject)
+
+def main():
+    openssl_bin = shutil.which('openssl')
+    if not openssl_bin:
+        return
+    try:
+        locale.setlocale(locale.LC_COLLATE, '')
+    except locale.Error:
+        pass
+
+    cache_file = os.path.join(os.environ.get("MK_VARDIR", "/var/lib/check_mk_agent"), "sslcertificates.cache")
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    new_cache = {}
+
+    sys.stdout.write('<<<sslcertificates:sep(0)>>>\n')
+    for certfile, single in get_cert_files(get_cert_dirs()):
+        if not wanted(certfile, single):
+            continue
+        try:
+            st = os.stat(certfile)
+            key = [st.st_mtime, st.st_size]
+            cached = cache.get(certfile)
+            if cached and cached[:2] == key:
+                line = cached[2]
+            else:
+                line = get_cert_info(openssl_bin, certfile)
+        except (OSError, ValueError, IndexError, KeyError):
+            continue
+        new_cache[certfile] = key + [line]
+        if line:
+            sys.stdout.write(line + '\n')
+
+    try:
+        with open(cache_file + '.new', 'w') as f:
+            json.dump(new_cache, f)
+        os.rename(cache_file + '.new', cache_file)
+    except OSError:
+        pass
+
+if __name__ == '__main__':
+    main()
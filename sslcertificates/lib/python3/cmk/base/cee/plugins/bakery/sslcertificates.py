@@ -21,9 +21,14 @@ from typing import Any, Dict
 from .bakery_api.v1 import FileGenerator, OS, Plugin, PluginConfig, register
 
 def get_sslcertificates_files(conf: Dict[str, Any]) -> FileGenerator:
-    yield Plugin(base_os=OS.LINUX,
-                 source=Path("sslcertificates"),
-                 interval=conf.get("interval"))
+    if conf.get("implementation") == "python":
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("sslcertificates.py"),
+                     interval=conf.get("interval"))
+    else:
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("sslcertificates"),
+                     interval=conf.get("interval"))
     yield Plugin(base_os=OS.WINDOWS,
                  source=Path("sslcertificates.ps1"),
                  interval=conf.get("interval"))
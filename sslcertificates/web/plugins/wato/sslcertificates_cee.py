@@ -12,6 +12,7 @@ try:
         Age,
         Alternative,
         Dictionary,
+        DropdownChoice,
         FixedValue,
         ListOfStrings,
         TextAscii,
@@ -48,6 +49,16 @@ try:
                            allow_empty = True,
                          )
                        ),
+                        ("implementation", DropdownChoice(
+                            title = _("Implementation on Linux"),
+                            help = _("The Python implementation caches the results per certificate file "
+                                     "and only inspects new or changed files. It needs Python 3 on the host."),
+                            choices = [
+                                ("bash", _("Shell script")),
+                                ("python", _("Python 3 with cache")),
+                            ],
+                            default_value = "bash",
+                        )),
                     ],
                     optional_keys = ['interval'],
                 ),
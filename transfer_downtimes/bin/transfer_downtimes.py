@@ -20,7 +20,12 @@
 # Boston, MA 02110-1301 USA.
 
 import os
+import re
 import sys
+import time
+import errno
+import fcntl
+import select
 import logwatcher
 import argparse
 import daemon
@@ -30,6 +35,8 @@ parser = argparse.ArgumentParser()
 parser.add_argument('-s', '--source', help='Source site', required=True)
 parser.add_argument('-t', '--dest', help='Destination site', default=os.environ['OMD_SITE'])
 parser.add_argument('-p', '--pidfile', help='PID file', default=os.path.join(os.environ['OMD_ROOT'], 'tmp/run/transfer_downtimes.pid'))
+parser.add_argument('-c', '--checkpoint', help='File to store the read position of the history in, it is written right after downtime commands were passed on', default=os.path.join(os.environ['OMD_ROOT'], 'var/transfer_downtimes.checkpoint'))
+parser.add_argument('-w', '--pipe-timeout', type=int, help='Seconds to wait for the command pipe of the destination site before giving up', default=300)
 parser.add_argument('-d', '--debug', action='store_true', help='Enable debug output', default=False)
 args = parser.parse_args()
 
@@ -40,24 +47,112 @@ if args.source == args.dest:
 logfilename = os.path.join('/omd/sites', args.source, 'var/check_mk/core/history')
 cmdfilename = os.path.join('/omd/sites', args.dest, 'tmp/run/nagios.cmd')
 
+downtime_re = re.compile('SCHEDULE_(?:HOST|SVC)_DOWNTIME')
+
+class CommandPipe(object):
+    """Keeps the command pipe of the destination site open and writes
+    the commands of one batch together. Reopens the pipe when the core
+    has been restarted and recreated it. While the pipe is unusable,
+    e.g. because the site is stopped, retries are logged and backed off,
+    after retry_timeout seconds the batch fails with EnvironmentError."""
+
+    # writes up to PIPE_BUF bytes are atomic and do not get mixed with
+    # commands from other writers
+    pipe_buf = getattr(select, 'PIPE_BUF', 4096)
+
+    def __init__(self, filename, retry_timeout=300):
+        self.filename = filename
+        self.retry_timeout = retry_timeout
+        self.fd = None
+
+    def open(self):
+        self.close()
+        # fails with ENXIO instead of blocking while no core reads the pipe
+        fd = os.open(self.filename, os.O_WRONLY | os.O_NONBLOCK)
+        fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) & ~os.O_NONBLOCK)
+        self.fd = fd
+
+    def close(self):
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except EnvironmentError:
+                pass
+            self.fd = None
+
+    def is_stale(self):
+        try:
+            return os.fstat(self.fd).st_ino != os.stat(self.filename).st_ino
+        except EnvironmentError:
+            return True
+
+    def chunks(self, cmds):
+        chunk = ''
+        for cmd in cmds:
+            if chunk and len(chunk) + len(cmd) > self.pipe_buf:
+                yield chunk
+                chunk = ''
+            chunk += cmd
+        if chunk:
+            yield chunk
+
+    def write(self, cmds):
+        for chunk in self.chunks(cmds):
+            deadline = None
+            delay = 1
+            while True:
+                try:
+                    if self.fd is None or self.is_stale():
+                        self.open()
+                    while chunk:
+                        chunk = chunk[os.write(self.fd, chunk):]
+                    break
+                except EnvironmentError as err:
+                    if err.errno not in (errno.EPIPE, errno.EBADF, errno.ENOENT, errno.ENXIO):
+                        raise
+                    # core went away, wait for the new pipe
+                    self.close()
+                    now = time.time()
+                    if deadline is None:
+                        # a restarted core may already have a new pipe
+                        deadline = now + self.retry_timeout
+                        continue
+                    if now >= deadline:
+                        raise EnvironmentError(err.errno, "giving up on %s after %d seconds: %s" % (
+                            self.filename, self.retry_timeout, err.strerror))
+                    sys.stderr.write("%s: %s, retrying in %d seconds\n" % (self.filename, err.strerror, delay))
+                    time.sleep(min(delay, deadline - now))
+                    delay = min(delay * 2, 60)
+
+cmdpipe = CommandPipe(cmdfilename, args.pipe_timeout)
+
 def handle_lines(filename, lines):
+    cmds = []
     for line in lines:
         if args.debug:
             print line
-        if 'SCHEDULE_HOST_DOWNTIME' in line or 'SCHEDULE_SVC_DOWNTIME' in line:
+        if downtime_re.search(line):
             words = line.split(' ')
             del(words[1:3])
             cmd = ' '.join(words)
+            if not cmd.endswith('\n'):
+                cmd += '\n'
             if args.debug:
                 print "found DOWNTIME command: %s" % cmd
-                print "writing to %s" % cmdfilename
-            cmdfile = open(cmdfilename, 'w')
-            cmdfile.write(cmd)
-            cmdfile.close()
+            cmds.append(cmd)
+    if cmds:
+        if args.debug:
+            print "writing %d commands to %s" % (len(cmds), cmdfilename)
+        cmdpipe.write(cmds)
+        # store the checkpoint now so that a crash does not repeat them
+        return True
 
 def tailer():
-    watcher = logwatcher.LogWatcher(os.path.dirname(logfilename), handle_lines, files=[os.path.basename(logfilename)])
-    watcher.loop(interval=2)
+    # leaving the context on SIGTERM writes the pending checkpoint
+    with logwatcher.LogWatcher(os.path.dirname(logfilename), handle_lines, files=[os.path.basename(logfilename)],
+                               checkpoint=args.checkpoint,
+                               rotated_folders=[os.path.join(os.path.dirname(logfilename), 'archive')]) as watcher:
+        watcher.loop(interval=2)
 
 if __name__ == '__main__':
     if args.debug:
@@ -13,6 +13,114 @@ import time
 import errno
 import stat
 import sys
+import json
+import select
+import struct
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
+
+class Inotify(object):
+    """Minimal inotify(7) binding via ctypes watching one directory.
+    Raises EnvironmentError if inotify is not available, e.g. on
+    non Linux systems.
+
+    Example:
+
+    >>> with Inotify("/var/log/") as inotify:
+    ...     for mask, name in inotify.read_events(timeout=10):
+    ...         print(mask, name)
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    # events which change the set of files in the directory
+    RESCAN_MASK = IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | \
+                  IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | \
+                  IN_Q_OVERFLOW | IN_IGNORED
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | \
+                 IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | \
+                 IN_MOVE_SELF
+
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, folder):
+        self.fd = None
+        if ctypes is None or not sys.platform.startswith('linux'):
+            raise EnvironmentError(errno.ENOSYS, 'inotify is not available')
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                           use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise EnvironmentError(errno.ENOSYS, 'inotify is not available')
+        self._libc = libc
+        fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise EnvironmentError(err, os.strerror(err))
+        self.fd = fd
+        if not isinstance(folder, bytes):
+            folder = folder.encode(sys.getfilesystemencoding())
+        if libc.inotify_add_watch(self.fd, folder, self.WATCH_MASK) < 0:
+            err = ctypes.get_errno()
+            self.close()
+            raise EnvironmentError(err, os.strerror(err))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read_events(self, timeout=None):
+        """Block until events arrive or *timeout* seconds passed.
+        Returns a list of (mask, name) tuples, empty on timeout.
+        """
+        try:
+            ready = select.select([self.fd], [], [], timeout)[0]
+        except select.error as err:
+            if err.args[0] == errno.EINTR:
+                return []
+            raise
+        if not ready:
+            return []
+        try:
+            buf = os.read(self.fd, 65536)
+        except EnvironmentError as err:
+            if err.errno in (errno.EAGAIN, errno.EINTR):
+                return []
+            raise
+        events = []
+        offset = 0
+        while offset + self._EVENT_HEADER.size <= len(buf):
+            wd, mask, cookie, length = self._EVENT_HEADER.unpack_from(buf, offset)
+            offset += self._EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if not isinstance(name, str):
+                name = name.decode(sys.getfilesystemencoding(), 'replace')
+            events.append((mask, name))
+        return events
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
 
 
 class LogWatcher(object):
@@ -30,7 +138,7 @@ class LogWatcher(object):
     """
 
     def __init__(self, folder, callback, files=[], extensions=["log"], tail_lines=0,
-                       sizehint=1048576):
+                       sizehint=1048576, checkpoint=None, rotated_folders=[]):
         """Arguments:
 
         (str) @folder:
@@ -39,7 +147,9 @@ class LogWatcher(object):
         (callable) @callback:
             a function which is called every time one of the file being
             watched is updated;
-            this is called with "filename" and "lines" arguments.
+            this is called with "filename" and "lines" arguments;
+            if it returns True the checkpoint is written right away,
+            e.g. after lines that must not be handled twice
 
         (list) @files:
             only watch specific files
@@ -54,6 +164,18 @@ class LogWatcher(object):
             approximation of the maximum number of bytes to read from
             a file on every ieration (as opposed to load the entire
             file in memory until EOF is reached). Defaults to 1MB.
+
+        (str) @checkpoint:
+            file to persist the file id and offset of every watched
+            file in; on start reading resumes from the stored offset
+            instead of EOF (tail_lines is ignored for these files);
+            it is written once the start positions are known and then
+            at most every checkpoint_interval seconds or
+            checkpoint_lines lines
+
+        (list) @rotated_folders:
+            additional folders to look for a rotated file in when a
+            watched file has been replaced since the last checkpoint
         """
         self.folder = os.path.realpath(folder)
         self.files = files
@@ -61,10 +183,19 @@ class LogWatcher(object):
         self._files_map = {}
         self._callback = callback
         self._sizehint = sizehint
+        self._checkpoint = checkpoint
+        self._rotated_folders = [self.folder] + list(rotated_folders)
         assert os.path.isdir(self.folder), self.folder
         assert callable(callback), repr(callback)
+        self._checkpoints = self.load_checkpoint()
+        self._checkpoint_dirty = False
+        self._checkpoint_pending = 0
+        self._checkpoint_saved = 0
         self.update_files()
-        for id, file in self._files_map.items():
+        for id, file in list(self._files_map.items()):
+            if file.name in self._checkpoints:
+                self.resume(file, *self._checkpoints[file.name])
+                continue
             file.seek(os.path.getsize(file.name))  # EOF
             if tail_lines:
                 try:
@@ -75,6 +206,92 @@ class LogWatcher(object):
                 else:
                     if lines:
                         self._callback(file.name, lines)
+        # a restart before the next line must not skip anything
+        for id, file in list(self._files_map.items()):
+            self.save_checkpoint(file)
+        self.flush_checkpoint(force=True)
+
+    # write the checkpoint file at most every checkpoint_interval
+    # seconds unless checkpoint_lines lines have been read since
+    checkpoint_interval = 5
+    checkpoint_lines = 10000
+
+    def load_checkpoint(self):
+        """Read the stored file ids and offsets."""
+        if not self._checkpoint:
+            return {}
+        try:
+            with open(self._checkpoint) as f:
+                return dict((name, tuple(value)) for name, value in json.load(f).items())
+        except EnvironmentError as err:
+            if err.errno != errno.ENOENT:
+                raise
+        except ValueError:
+            self.log("ignoring broken checkpoint %s" % self._checkpoint)
+        return {}
+
+    def save_checkpoint(self, file, name=None, lines=0):
+        """Remember file id and offset of *file* under *name* (defaults
+        to the file's name) after *lines* lines have been read.
+        flush_checkpoint() writes them to the checkpoint file."""
+        if not self._checkpoint:
+            return
+        fid = self.get_file_id(os.fstat(file.fileno()))
+        self._checkpoints[name or file.name] = (fid, file.tell())
+        self._checkpoint_dirty = True
+        self._checkpoint_pending += lines
+
+    def flush_checkpoint(self, force=False):
+        """Write the remembered offsets to the checkpoint file if they
+        changed and checkpoint_interval seconds or checkpoint_lines
+        lines passed since the last write, always if *force* is set."""
+        if not self._checkpoint or not self._checkpoint_dirty:
+            return
+        if not force and self._checkpoint_pending < self.checkpoint_lines and \
+                time.time() - self._checkpoint_saved < self.checkpoint_interval:
+            return
+        tmpname = self._checkpoint + '.new'
+        with open(tmpname, 'w') as f:
+            json.dump(self._checkpoints, f)
+        os.rename(tmpname, self._checkpoint)
+        self._checkpoint_dirty = False
+        self._checkpoint_pending = 0
+        self._checkpoint_saved = time.time()
+
+    def find_rotated(self, fid):
+        """Find the file with the file id *fid* in the rotated
+        folders."""
+        for folder in self._rotated_folders:
+            try:
+                names = os.listdir(folder)
+            except EnvironmentError:
+                continue
+            for name in names:
+                absname = os.path.join(folder, name)
+                try:
+                    st = os.stat(absname)
+                except EnvironmentError:
+                    continue
+                if stat.S_ISREG(st.st_mode) and self.get_file_id(st) == fid:
+                    return absname
+
+    def resume(self, file, fid, offset):
+        """Continue reading *file* from the checkpoint. If it has been
+        replaced read the rest of the rotated file first."""
+        if fid == self.get_file_id(os.fstat(file.fileno())):
+            if offset > os.fstat(file.fileno()).st_size:
+                offset = 0  # truncated
+            self.log("resuming logfile %s at offset %d" % (file.name, offset))
+            file.seek(offset)
+        else:
+            rotated = self.find_rotated(fid)
+            if rotated:
+                self.log("resuming rotated logfile %s at offset %d" % (rotated, offset))
+                with self.open(rotated) as old:
+                    old.seek(offset)
+                    self.readlines(old, name=file.name)
+            file.seek(0)
+        self.readlines(file)
 
     def __enter__(self):
         return self
@@ -85,22 +302,62 @@ class LogWatcher(object):
     def __del__(self):
         self.close()
 
-    def loop(self, interval=0.1, blocking=True):
+    # in inotify mode rescan the folder at least this often (seconds)
+    # in case an event got lost
+    inotify_timeout = 60
+
+    def loop(self, interval=0.1, blocking=True, use_inotify=True):
         """Start a busy loop checking for file changes every *interval*
         seconds. If *blocking* is False make one loop then return.
+        If *use_inotify* is True and inotify is available block until
+        the directory being watched is updated instead of polling.
         """
-        # May be overridden in order to use pyinotify lib and block
-        # until the directory being watched is updated.
+        if blocking and use_inotify:
+            try:
+                inotify = Inotify(self.folder)
+            except EnvironmentError as err:
+                self.log("inotify not available (%s), polling every %ss" % (err, interval))
+            else:
+                with inotify:
+                    return self.loop_inotify(inotify)
         # Note that directly calling readlines() as we do is faster
         # than first checking file's last modification times.
         while True:
             self.update_files()
             for fid, file in list(self._files_map.items()):
                 self.readlines(file)
+            self.flush_checkpoint(force=not blocking)
             if not blocking:
                 return
             time.sleep(interval)
 
+    def loop_inotify(self, inotify):
+        """Block on *inotify* events and read the watched files only
+        when one of them changed. The directory is rescanned when files
+        are created, moved or deleted (rotation) and after
+        *inotify_timeout* seconds without any event.
+        """
+        rescan = True
+        while True:
+            if rescan:
+                self.update_files()
+            for fid, file in list(self._files_map.items()):
+                self.readlines(file)
+            self.flush_checkpoint()
+            while True:
+                # wake up in time to write a pending checkpoint
+                events = inotify.read_events(self.checkpoint_interval
+                                             if self._checkpoint_dirty
+                                             else self.inotify_timeout)
+                if not events:
+                    rescan = True
+                    break
+                relevant = [ mask for mask, name in events
+                             if not name or self.filter([name]) ]
+                if relevant:
+                    rescan = any(mask & Inotify.RESCAN_MASK for mask in relevant)
+                    break
+
     def log(self, line):
         """Log when a file is un/watched"""
         print(line)
@@ -110,7 +367,10 @@ class LogWatcher(object):
         You may want to override this to add extra logic or globbing
         support.
         """
-        ls = os.listdir(self.folder)
+        return self.filter(os.listdir(self.folder))
+
+    def filter(self, ls):
+        """Filter file names by the files and extensions settings."""
         if self.files:
             return [x for x in ls if x in self.files ]
         elif self.extensions:
@@ -202,15 +462,19 @@ class LogWatcher(object):
             if fid not in self._files_map:
                 self.watch(fname)
 
-    def readlines(self, file):
+    def readlines(self, file, name=None):
         """Read file lines since last access until EOF is reached and
-        invoke callback.
+        invoke callback. The offset is remembered under *name* after
+        every chunk, the checkpoint file is written when due or when
+        the callback returned True.
         """
         while True:
             lines = file.readlines(self._sizehint)
             if not lines:
                 break
-            self._callback(file.name, lines)
+            handled = self._callback(file.name, lines)
+            self.save_checkpoint(file, name, len(lines))
+            self.flush_checkpoint(force=handled is True)
 
     def watch(self, fname):
         try:
@@ -242,6 +506,8 @@ class LogWatcher(object):
             return "%f" % st.st_ctime
 
     def close(self):
+        if getattr(self, '_checkpoint_dirty', False):
+            self.flush_checkpoint(force=True)
         for id, file in self._files_map.items():
             file.close()
         self._files_map.clear()
@@ -352,6 +618,103 @@ if __name__ == '__main__':
             with self.watcher:
                 pass
 
+        def test_inotify(self):
+            try:
+                inotify = Inotify(os.getcwd())
+            except EnvironmentError:
+                return  # not available on this platform
+            with inotify:
+                self.write_file('foo\n')
+                events = inotify.read_events(timeout=1)
+                self.assertTrue(TESTFN in [name for mask, name in events])
+                self.assertEqual(inotify.read_events(timeout=0), [])
+                os.rename(TESTFN, TESTFN2)
+                masks = [mask for mask, name in inotify.read_events(timeout=1)]
+                self.assertTrue(any(mask & Inotify.RESCAN_MASK for mask in masks))
+
+        def test_checkpoint(self):
+            checkpoint = TESTFN + '.checkpoint'
+            self.addCleanup(os.remove, checkpoint)
+            self.watcher.close()
+            self.write_file('foo\n')
+            self.watcher = LogWatcher(os.getcwd(), self.watcher._callback,
+                                      checkpoint=checkpoint)
+            self.write_file('bar\n')
+            self.watcher.loop(blocking=False)
+            self.watcher.close()
+            self.write_file('baz\n')
+            self.watcher = LogWatcher(os.getcwd(), self.watcher._callback,
+                                      checkpoint=checkpoint)
+            self.assertEqual(self.lines, [b"bar\n", b"baz\n"])
+
+        def test_checkpoint_rotated(self):
+            checkpoint = TESTFN + '.checkpoint'
+            rotated = TESTFN + '.1'
+            self.addCleanup(os.remove, checkpoint)
+            self.addCleanup(os.remove, rotated)
+            self.watcher.close()
+            self.watcher = LogWatcher(os.getcwd(), self.watcher._callback,
+                                      files=[TESTFN], checkpoint=checkpoint)
+            self.write_file('foo\n')
+            self.watcher.loop(blocking=False)
+            self.watcher.close()
+            self.write_file('bar\n')
+            self.file.close()
+            os.rename(TESTFN, rotated)
+            self.file = open(TESTFN, 'w')
+            self.write_file('baz\n')
+            self.watcher = LogWatcher(os.getcwd(), self.watcher._callback,
+                                      files=[TESTFN], checkpoint=checkpoint)
+            self.assertEqual(self.lines, [b"foo\n", b"bar\n", b"baz\n"])
+
+        def test_checkpoint_startup(self):
+            checkpoint = TESTFN + '.checkpoint'
+            self.addCleanup(os.remove, checkpoint)
+            self.watcher.close()
+            self.write_file('foo\n')
+            self.watcher = LogWatcher(os.getcwd(), self.watcher._callback,
+                                      checkpoint=checkpoint)
+            self.watcher.close()
+            self.write_file('bar\n')
+            self.watcher = LogWatcher(os.getcwd(), self.watcher._callback,
+                                      checkpoint=checkpoint)
+            self.assertEqual(self.lines, [b"bar\n"])
+
+        def test_checkpoint_throttled(self):
+            checkpoint = TESTFN + '.checkpoint'
+            self.addCleanup(os.remove, checkpoint)
+            self.watcher.close()
+            self.watcher = LogWatcher(os.getcwd(), self.watcher._callback,
+                                      checkpoint=checkpoint)
+            with open(checkpoint) as f:
+                started = f.read()
+            self.write_file('foo\n')
+            self.watcher.readlines(self.watcher._files_map[
+                self.watcher.get_file_id(os.stat(TESTFN))])
+            with open(checkpoint) as f:
+                self.assertEqual(f.read(), started)
+            self.watcher.flush_checkpoint(force=True)
+            with open(checkpoint) as f:
+                self.assertNotEqual(f.read(), started)
+
+        def test_checkpoint_callback(self):
+            checkpoint = TESTFN + '.checkpoint'
+            self.addCleanup(os.remove, checkpoint)
+            self.watcher.close()
+            self.watcher = LogWatcher(os.getcwd(), lambda filename, lines: True,
+                                      checkpoint=checkpoint)
+            with open(checkpoint) as f:
+                started = f.read()
+            self.write_file('foo\n')
+            self.watcher.readlines(self.watcher._files_map[
+                self.watcher.get_file_id(os.stat(TESTFN))])
+            with open(checkpoint) as f:
+                self.assertNotEqual(f.read(), started)
+
+        def test_filter(self):
+            self.watcher.files = [TESTFN]
+            self.assertEqual(self.watcher.filter([TESTFN, TESTFN2]), [TESTFN])
+
 
     test_suite = unittest.TestSuite()
     test_suite.addTest(unittest.makeSuite(TestLogWatcher))
@@ -48,9 +48,9 @@ def parse_wagner_racksens2(string_table: StringTable):
             int(string_table[1][0][28]),
             int(string_table[1][0][29]),
         ),
-        'temps': [
-            ('Air', float(string_table[1][0][8]), None, None),
-        ],
+        'temps': {
+            'Air': (float(string_table[1][0][8]), None, None),
+        },
         'detectors': {},
         'alarms': {
             'Extinguishing': int(string_table[0][0][3]),
@@ -74,10 +74,9 @@ def parse_wagner_racksens2(string_table: StringTable):
             }
     for temp in [1, 2, 3, 4, 5]:
         if int(string_table[1][0][temp + 22]):
-            section['temps'].append( (str(temp),
-                                      float(string_table[1][0][temp + 2]),
-                                      float(string_table[1][0][temp + 13]),
-                                      int(string_table[0][0][temp + 9])) )
+            section['temps'][str(temp)] = (float(string_table[1][0][temp + 2]),
+                                           float(string_table[1][0][temp + 13]),
+                                           int(string_table[0][0][temp + 9]))
     return section
 
 snmp_section_wagner_racksens2 = SNMPSection(
@@ -192,33 +191,33 @@ def discover_wagner_racksens2_detector(section) -> DiscoveryResult:
         yield Service(item=d)
 
 def check_wagner_racksens2_detector(item, params, section) -> CheckResult:
-    for d, vals in section.get('detectors', {}).items():
-        if item == d:
-            yield Result(state=State.OK,
-                         summary="Serial: %d" % vals['serial'])
-            if vals['prealarm']:
-                yield Result(state=State.WARN, summary="Action Alarm")
-            if vals['mainalarm']:
-                yield Result(state=State.CRIT, summary="Fire Alarm")
-            yield from check_levels(
-                vals['smoke'],
-                levels_upper=("fixed", params.get('smoke_levels')),
-                metric_name="smoke_perc",
-                label="Smoke detected",
-                render_func=render.percent,
-            )
-            levels_lower = params.get('chamber_levels')
-            if isinstance(levels_lower, tuple):
-                warn, crit = levels_lower
-                levels_lower = ("fixed", (-warn, -crit))
-            yield from check_levels(
-                vals['chamber'],
-                levels_upper=("fixed", params.get('chamber_levels')),
-                levels_lower=levels_lower,
-                metric_name="chamber_perc",
-                label="Chamber Deviation",
-                render_func=render.percent,
-            )
+    vals = section.get('detectors', {}).get(item)
+    if vals:
+        yield Result(state=State.OK,
+                     summary="Serial: %d" % vals['serial'])
+        if vals['prealarm']:
+            yield Result(state=State.WARN, summary="Action Alarm")
+        if vals['mainalarm']:
+            yield Result(state=State.CRIT, summary="Fire Alarm")
+        yield from check_levels(
+            vals['smoke'],
+            levels_upper=("fixed", params.get('smoke_levels')),
+            metric_name="smoke_perc",
+            label="Smoke detected",
+            render_func=render.percent,
+        )
+        levels_lower = params.get('chamber_levels')
+        if isinstance(levels_lower, tuple):
+            warn, crit = levels_lower
+            levels_lower = ("fixed", (-warn, -crit))
+        yield from check_levels(
+            vals['chamber'],
+            levels_upper=("fixed", params.get('chamber_levels')),
+            levels_lower=levels_lower,
+            metric_name="chamber_perc",
+            label="Chamber Deviation",
+            render_func=render.percent,
+        )
 
 check_plugin_wagner_racksens2_detector = CheckPlugin(
     name="wagner_racksens2_detector",
@@ -246,25 +245,25 @@ check_plugin_wagner_racksens2_detector = CheckPlugin(
 #   '----------------------------------------------------------------------'
 
 def discover_wagner_racksens2_temp(section) -> DiscoveryResult:
-    for temp in section.get('temps', []):
-        yield Service(item=temp[0])
+    for temp in section.get('temps', {}):
+        yield Service(item=temp)
 
 def check_wagner_racksens2_temp(item, params, section) -> CheckResult:
-    for temp in section.get('temps', []):
-        if temp[0] == item:
-            if temp[2] is None or temp[3] is None:
-                yield from temperature.check_temperature(
-                    temp[1],
-                    params,
-                )
-            else:
-                yield from temperature.check_temperature(
-                    temp[1],
-                    params,
-                    dev_levels = (temp[2], temp[2]),
-                    dev_status = temp[3] * 2,
-                    dev_status_name = 'Alarm',
-                )
+    temp = section.get('temps', {}).get(item)
+    if temp:
+        if temp[1] is None or temp[2] is None:
+            yield from temperature.check_temperature(
+                temp[0],
+                params,
+            )
+        else:
+            yield from temperature.check_temperature(
+                temp[0],
+                params,
+                dev_levels = (temp[1], temp[1]),
+                dev_status = temp[2] * 2,
+                dev_status_name = 'Alarm',
+            )
 
 check_plugin_wagner_racksens2_temp = CheckPlugin(
     name="wagner_racksens2_temp",
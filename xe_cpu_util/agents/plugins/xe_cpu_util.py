@@ -8,35 +8,63 @@ import sys
 
 xeninventory='/etc/xensource-inventory'
 xe=distutils.spawn.find_executable('xe')
+cachefile=os.path.join(os.environ.get('MK_VARDIR', '/var/lib/check_mk_agent'), 'xe_cpu_util.cache')
 
 def execute(cmd):
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, universal_newlines=True)
     return p.stdout.readlines()
 
-if xe:
-    hostuuid = None
+def get_hostuuid():
+    hostname = socket.gethostname()
     if os.path.isfile(xeninventory):
         for line in open(xeninventory).readlines():
             name, key = line.split('=')
             if name == 'INSTALLATION_UUID':
-                hostuuid = key.split("'")[1]
-    if not hostuuid:
-        for line in execute([xe, 'host-list', 'hostname=%s' % socket.gethostname() ]):
-            if line.startswith('uuid'):
-                hostuuid = line.split()[4]
-    if not hostuuid:
-        sys.exit(1)
-    cpuuuid = None
+                return key.split("'")[1]
+    # the UUID of the host does not change, cache the result of xe host-list
+    if os.path.isfile(cachefile):
+        words = open(cachefile).read().split()
+        if len(words) == 2 and words[0] == hostname:
+            return words[1]
+    for line in execute([xe, 'host-list', 'hostname=%s' % hostname ]):
+        if line.startswith('uuid'):
+            hostuuid = line.split()[4]
+            try:
+                with open(cachefile + '.new', 'w') as f:
+                    f.write('%s %s\n' % (hostname, hostuuid))
+                os.rename(cachefile + '.new', cachefile)
+            except (IOError, OSError):
+                pass
+            return hostuuid
+
+def get_cpus(hostuuid):
+    # one call for all CPUs, returns {number: [uuid, utilisation]}
     cpus = {}
-    for line in execute([xe, 'host-cpu-list', 'host-uuid=%s' % hostuuid, 'params=uuid,number']):
+    cpuuuid = None
+    for line in execute([xe, 'host-cpu-list', 'host-uuid=%s' % hostuuid, 'params=uuid,number,utilisation']):
         words = line.split()
         if words:
             if words[0] == 'uuid':
-                cpuuuid=words[4]
+                cpuuuid = words[4]
+                cpu = [cpuuuid, None]
             if words[0] == 'number' and cpuuuid:
-                cpus[int(words[3])] = cpuuuid
+                cpus[int(words[3])] = cpu
+            if words[0] == 'utilisation' and cpuuuid:
+                cpu[1] = words[3]
+    return cpus
+
+if xe:
+    hostuuid = get_hostuuid()
+    if not hostuuid:
+        sys.exit(1)
+    cpus = get_cpus(hostuuid)
     if cpus:
         print('<<<xe_cpu_util>>>')
         for cpuid in sorted(cpus.keys()):
-            for line in execute([xe, 'host-cpu-param-get', 'uuid=%s' % cpus[cpuid], 'param-name=utilisation']):
-                print("%d %s %s" % (cpuid, cpus[cpuid], line.strip()))
+            cpuuuid, utilisation = cpus[cpuid]
+            if utilisation is None:
+                # older xe without utilisation in host-cpu-list
+                for line in execute([xe, 'host-cpu-param-get', 'uuid=%s' % cpuuuid, 'param-name=utilisation']):
+                    print("%d %s %s" % (cpuid, cpuuuid, line.strip()))
+            else:
+                print("%d %s %s" % (cpuid, cpuuuid, utilisation))
@@ -0,0 +1 @@
+../../../../../postfix_mailq_details/agents/plugins/lib/postfix_mailq_details/spoolscan.py
\ No newline at end of file
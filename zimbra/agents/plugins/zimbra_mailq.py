@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8; py-indent-offset: 4 -*-
+
+#
+# (c) 2026 Heinlein Consulting GmbH
+#          Robert Sander <r.sander@heinlein-support.de>
+#
+
+# This is free software;  you can redistribute it and/or modify it
+# under the  terms of the  GNU General Public License  as published by
+# the Free Software Foundation in version 2.  This file is distributed
+# in the hope that it will be useful, but WITHOUT ANY WARRANTY;  with-
+# out even the implied warranty of  MERCHANTABILITY  or  FITNESS FOR A
+# PARTICULAR PURPOSE. See the  GNU General Public License for more de-
+# ails.  You should have  received  a copy of the  GNU  General Public
+# License along with GNU Make; see the file  COPYING.  If  not,  write
+# to the Free Software Foundation, Inc., 51 Franklin St,  Fifth Floor,
+# Boston, MA 02110-1301 USA.
+
+#
+# Python implementation of the zimbra_mailq agent plugin.
+#
+# Produces the same output as the shell plugin, the deferred queue is
+# walked only once with spoolscan.py from lib/zimbra/ next to this
+# plugin. With TIMEOUT set in $MK_CONFDIR/zimbra_mailq the walk stops
+# after that many seconds and the line ends with "(partial)".
+#
+
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib', 'zimbra'))
+import spoolscan
+
+POSTCONF = '/opt/zimbra/bin/postconf'
+
+def main():
+    if not os.access(POSTCONF, os.X_OK):
+        return
+    conf = spoolscan.read_config(os.path.join(os.environ.get("MK_CONFDIR", "/etc/check_mk"), "zimbra_mailq"), {
+        'TIMEOUT': '',
+    })
+
+    sys.stdout.write('<<<postfix_mailq>>>\n')
+    queue_directory = subprocess.run([POSTCONF, '-h', 'queue_directory'],
+                                     stdout=subprocess.PIPE,
+                                     universal_newlines=True).stdout.strip()
+    stats = spoolscan.scan(os.path.join(queue_directory, 'deferred'), until=spoolscan.deadline(conf['TIMEOUT']))
+    if stats and stats.count > 0:
+        sys.stdout.write('-- %d Kbytes in %d Requests.%s\n' % (stats.kbytes, stats.count,
+                                                               ' (partial)' if stats.partial else ''))
+    else:
+        sys.stdout.write('Mail queue is empty\n')
+
+if __name__ == '__main__':
+    main()
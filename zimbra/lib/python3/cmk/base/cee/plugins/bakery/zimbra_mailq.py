@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8; py-indent-offset: 4 -*-
+
+# (c) 2026 Heinlein Consulting GmbH
+#          Robert Sander <r.sander@heinlein-support.de>
+
+# This is free software;  you can redistribute it and/or modify it
+# under the  terms of the  GNU General Public License  as published by
+# the Free Software Foundation in version 2.  This file is distributed
+# in the hope that it will be useful, but WITHOUT ANY WARRANTY;  with-
+# out even the implied warranty of  MERCHANTABILITY  or  FITNESS FOR A
+# PARTICULAR PURPOSE. See the  GNU General Public License for more de-
+# ails.  You should have  received  a copy of the  GNU  General Public
+# License along with GNU Make; see the file  COPYING.  If  not,  write
+# to the Free Software Foundation, Inc., 51 Franklin St,  Fifth Floor,
+# Boston, MA 02110-1301 USA.
+
+from pathlib import Path
+from typing import Any, Dict
+
+from .bakery_api.v1 import FileGenerator, OS, Plugin, PluginConfig, register
+
+def get_zimbra_mailq_files(conf: Dict[str, Any]) -> FileGenerator:
+    if conf.get("implementation") == "python":
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("zimbra_mailq.py"))
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("lib/zimbra/spoolscan.py"),
+                     target=Path("lib/zimbra/spoolscan.py"))
+        if "timeout" in conf:
+            yield PluginConfig(base_os=OS.LINUX,
+                               lines=['TIMEOUT=%d' % conf["timeout"]],
+                               target=Path("zimbra_mailq"),
+                               include_header=True)
+    else:
+        yield Plugin(base_os=OS.LINUX,
+                     source=Path("zimbra_mailq"))
+
+register.bakery_plugin(
+    name="zimbra_mailq",
+    files_function=get_zimbra_mailq_files,
+)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- encoding: utf-8; py-indent-offset: 4 -*-
+
+# (c) 2026 Heinlein Consulting GmbH
+#          Robert Sander <r.sander@heinlein-support.de>
+
+# This is free software;  you can redistribute it and/or modify it
+# under the  terms of the  GNU General Public License  as published by
+# the Free Software Foundation in version 2.  This file is distributed
+# in the hope that it will be useful, but WITHOUT ANY WARRANTY;  with-
+# out even the implied warranty of  MERCHANTABILITY  or  FITNESS FOR A
+# PARTICULAR PURPOSE. See the  GNU General Public License for more de-
+# ails.  You should have  received  a copy of the  GNU  General Public
+# License along with GNU Make; see the file  COPYING.  If  not,  write
+# to the Free Software Foundation, Inc., 51 Franklin St,  Fifth Floor,
+# Boston, MA 02110-1301 USA.
+
+try:
+    from cmk.gui.i18n import _
+    from cmk.gui.plugins.wato import (
+        HostRulespec,
+        rulespec_registry,
+    )
+    from cmk.gui.cee.plugins.wato.agent_bakery.rulespecs.utils import RulespecGroupMonitoringAgentsAgentPlugins
+    from cmk.gui.valuespec import (
+        Age,
+        Alternative,
+        Dictionary,
+        DropdownChoice,
+        FixedValue,
+    )
+
+    def _valuespec_agent_config_zimbra_mailq():
+        return Alternative(
+            title = _("Zimbra mail queue (Linux)"),
+            help = _("This will deploy the agent plugin <tt>zimbra_mailq</tt> "
+                     "for checking the deferred queue of the Postfix in Zimbra."),
+            style = "dropdown",
+            elements = [
+                Dictionary(
+                    title = _("Deploy the Zimbra mail queue plugin"),
+                    elements = [
+                        ("implementation", DropdownChoice(
+                            title = _("Implementation"),
+                            help = _("The Python implementation walks the queue only once instead of "
+                                     "running find and du. It needs Python 3 on the host."),
+                            choices = [
+                                ("bash", _("Shell script")),
+                                ("python", _("Python 3 single pass")),
+                            ],
+                            default_value = "bash",
+                        )),
+                        ("timeout", Age(
+                            title = _("Time budget"),
+                            help = _("Only used by the Python implementation. The queue is not walked any "
+                                     "longer than this, an incomplete result is reported as such."),
+                            default_value = 30,
+                        )),
+                    ],
+                    optional_keys = ["implementation", "timeout"],
+                ),
+                FixedValue(None, title = _("Do not deploy the Zimbra mail queue plugin"), totext = _("(disabled)") ),
+            ]
+        )
+
+    rulespec_registry.register(
+         HostRulespec(
+             group=RulespecGroupMonitoringAgentsAgentPlugins,
+             name="agent_config:zimbra_mailq",
+             valuespec=_valuespec_agent_config_zimbra_mailq,
+         ))
+
+except ModuleNotFoundError:
+    # RAW edition
+    pass